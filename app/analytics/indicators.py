@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import numpy as np
 import pandas as pd
 
+from app.analytics.subject_classifier import classify_subjects
 from app.core.errors import AppError, ErrorCode
 
 
@@ -13,6 +14,7 @@ from app.core.errors import AppError, ErrorCode
 class IndicatorResult:
     metrics: pd.DataFrame
     warnings: list[str]
+    base: pd.DataFrame = field(default_factory=pd.DataFrame)
 
 
 SUBJECT_RULES = {
@@ -23,119 +25,113 @@ SUBJECT_RULES = {
     "equity": ["所有者权益", "股东权益"],
 }
 
+SUBJECT_STATEMENTS = {
+    "net_profit": "income_statement",
+    "revenue": "income_statement",
+    "current_assets": "balance_sheet",
+    "current_liabilities": "balance_sheet",
+    "equity": "balance_sheet",
+}
+
 
-def _match_subject(df: pd.DataFrame, keywords: list[str]) -> pd.DataFrame:
-    pattern = "|".join(keywords)
-    return df[df["subject_path"].str.contains(pattern, na=False)]
+INDICATOR_DEFINITIONS = {
+    "net_profit_margin": ("net_profit", "revenue", "净利润率"),
+    "current_ratio": ("current_assets", "current_liabilities", "流动比率"),
+    "roe": ("net_profit", "equity", "ROE"),
+}
 
 
-def _get_amount(
-    facts: pd.DataFrame,
-    company: str,
-    year: int,
-    statement_type: str,
-    keywords: list[str],
-) -> float:
-    subset = facts[
-        (facts["company_name"] == company)
-        & (facts["year"] == year)
-        & (facts["statement_type"] == statement_type)
+def _subject_amounts(facts: pd.DataFrame, subject_map: pd.DataFrame) -> pd.DataFrame:
+    rule_statements = pd.DataFrame(
+        list(SUBJECT_STATEMENTS.items()), columns=["rule_name", "statement_type"]
+    )
+    matched = facts[["company_name", "year", "statement_type", "subject_path", "amount"]].merge(
+        subject_map.dropna(subset=["rule_name"]).drop_duplicates(), on="subject_path"
+    )
+    matched = matched.merge(rule_statements, on=["rule_name", "statement_type"])
+    amounts = (
+        matched.groupby(["company_name", "year", "rule_name"])["amount"]
+        .sum()
+        .unstack("rule_name")
+    )
+
+    pairs = facts[["company_name", "year"]].drop_duplicates()
+    company_order = {company: idx for idx, company in enumerate(facts["company_name"].unique())}
+    pairs = pairs.iloc[
+        pairs["company_name"].map(company_order).to_numpy().argsort(kind="stable")
     ]
-    matched = _match_subject(subset, keywords)
-    return matched["amount"].sum()
+    index = pd.MultiIndex.from_frame(pairs)
+    return amounts.reindex(index=index, columns=list(SUBJECT_RULES)).fillna(0.0).astype(float)
 
 
 def calculate_indicators(
     facts: pd.DataFrame,
     missing_value_strategy: str = "warn",
+    subject_map: pd.DataFrame | None = None,
 ) -> IndicatorResult:
-    metrics: list[dict] = []
-    warnings: list[str] = []
+    if subject_map is None:
+        subject_map = classify_subjects(facts["subject_path"].unique(), SUBJECT_RULES)
+    amounts = _subject_amounts(facts, subject_map)
+
+    base = amounts.copy()
+    frames: list[pd.DataFrame] = []
+    for position, (indicator_name, (numerator_rule, denominator_rule, label)) in enumerate(
+        INDICATOR_DEFINITIONS.items()
+    ):
+        numerator = amounts[numerator_rule].to_numpy()
+        denominator = amounts[denominator_rule].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = np.where(denominator == 0, np.nan, numerator / denominator)
+        base[indicator_name] = value
+        frames.append(
+            pd.DataFrame(
+                {
+                    "company_name": amounts.index.get_level_values("company_name"),
+                    "year": amounts.index.get_level_values("year").astype(int),
+                    "indicator_name": indicator_name,
+                    "indicator_value": value,
+                    "numerator": numerator,
+                    "denominator": denominator,
+                    "label": label,
+                    "_row": np.arange(len(amounts)),
+                    "_position": position,
+                }
+            )
+        )
+
+    long_df = pd.concat(frames, ignore_index=True).sort_values(
+        ["_row", "_position"], kind="stable"
+    )
 
-    companies = facts["company_name"].unique()
-
-    for company in companies:
-        company_years = facts[facts["company_name"] == company]["year"].unique()
-        for year in company_years:
-            try:
-                net_profit = _get_amount(
-                    facts,
-                    company,
-                    year,
-                    "income_statement",
-                    SUBJECT_RULES["net_profit"],
-                )
-                revenue = _get_amount(
-                    facts,
-                    company,
-                    year,
-                    "income_statement",
-                    SUBJECT_RULES["revenue"],
-                )
-                current_assets = _get_amount(
-                    facts,
-                    company,
-                    year,
-                    "balance_sheet",
-                    SUBJECT_RULES["current_assets"],
-                )
-                current_liabilities = _get_amount(
-                    facts,
-                    company,
-                    year,
-                    "balance_sheet",
-                    SUBJECT_RULES["current_liabilities"],
-                )
-                equity = _get_amount(
-                    facts,
-                    company,
-                    year,
-                    "balance_sheet",
-                    SUBJECT_RULES["equity"],
-                )
-            except KeyError as exc:
-                raise AppError(
-                    code=ErrorCode.MISSING_REQUIRED_SUBJECT,
-                    message="Missing required subject mapping.",
-                    status_code=400,
-                    details={"error": str(exc)},
-                ) from exc
-
-            indicator_map = {
-                "net_profit_margin": (net_profit, revenue, "净利润率"),
-                "current_ratio": (current_assets, current_liabilities, "流动比率"),
-                "roe": (net_profit, equity, "ROE"),
-            }
-
-            for indicator_name, (numerator, denominator, label) in indicator_map.items():
-                if denominator == 0:
-                    if missing_value_strategy == "error":
-                        raise AppError(
-                            code=ErrorCode.MISSING_REQUIRED_SUBJECT,
-                            message=f"Missing denominator for {indicator_name}.",
-                            status_code=400,
-                        )
-                    warnings.append(f"{company}-{year}:{label} denominator missing")
-                    value = np.nan
-                else:
-                    value = numerator / denominator
-
-                metrics.append(
-                    {
-                        "company_name": company,
-                        "year": int(year),
-                        "indicator_name": indicator_name,
-                        "indicator_value": value,
-                        "details": json.dumps(
-                            {
-                                "numerator": numerator,
-                                "denominator": denominator,
-                                "label": label,
-                            },
-                            ensure_ascii=False,
-                        ),
-                    }
-                )
-
-    metrics_df = pd.DataFrame(metrics)
-    return IndicatorResult(metrics=metrics_df, warnings=warnings)
+    warnings: list[str] = []
+    missing = long_df[long_df["denominator"] == 0]
+    if not missing.empty:
+        if missing_value_strategy == "error":
+            raise AppError(
+                code=ErrorCode.MISSING_REQUIRED_SUBJECT,
+                message=f"Missing denominator for {missing['indicator_name'].iloc[0]}.",
+                status_code=400,
+            )
+        warnings = [
+            f"{company}-{year}:{label} denominator missing"
+            for company, year, label in zip(
+                missing["company_name"], missing["year"], missing["label"], strict=False
+            )
+        ]
+
+    long_df["details"] = [
+        json.dumps(
+            {"numerator": numerator, "denominator": denominator, "label": label},
+            ensure_ascii=False,
+        )
+        for numerator, denominator, label in zip(
+            long_df["numerator"].tolist(),
+            long_df["denominator"].tolist(),
+            long_df["label"],
+            strict=False,
+        )
+    ]
+    metrics_df = long_df[
+        ["company_name", "year", "indicator_name", "indicator_value", "details"]
+    ].reset_index(drop=True)
+    return IndicatorResult(metrics=metrics_df, warnings=warnings, base=base.sort_index())
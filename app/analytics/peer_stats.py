@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+PEER_QUANTILES = {"p10": 0.1, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p90": 0.9}
+UNASSIGNED_PEER_GROUP = "unassigned"
+ALL_PEER_GROUP = "all"
+
+
+@dataclass
+class PeerStatsResult:
+    percentiles: pd.DataFrame
+    distribution: pd.DataFrame
+
+
+def assign_peer_groups(companies: pd.Series, profiles_df: pd.DataFrame) -> pd.Series:
+    if profiles_df.empty:
+        return pd.Series(UNASSIGNED_PEER_GROUP, index=companies.index)
+    profiles = profiles_df.set_index("company_name")
+    parts = profiles[["industry", "size_bucket"]].fillna("").astype(str)
+    # The separator stays even when one side is blank, so "X/" (industry only) and
+    # "/X" (size only) remain different groups.
+    labels = parts["industry"].str.strip() + "/" + parts["size_bucket"].str.strip()
+    labels = labels.replace("/", UNASSIGNED_PEER_GROUP)
+    return companies.map(labels).fillna(UNASSIGNED_PEER_GROUP)
+
+
+def _distribution(values: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    grouped = values.groupby(keys)["indicator_value"]
+    summary = grouped.agg(count="count", mean="mean", std="std")
+    quantiles = grouped.quantile(list(PEER_QUANTILES.values())).unstack()
+    quantiles.columns = list(PEER_QUANTILES)
+    return summary.join(quantiles).reset_index()
+
+
+def calculate_peer_stats(metrics_df: pd.DataFrame, profiles_df: pd.DataFrame) -> PeerStatsResult:
+    values = metrics_df[["company_name", "year", "indicator_name", "indicator_value"]].dropna(
+        subset=["indicator_value"]
+    )
+    values = values.assign(peer_group=assign_peer_groups(values["company_name"], profiles_df))
+
+    keys = ["peer_group", "year", "indicator_name"]
+    grouped = values.groupby(keys)["indicator_value"]
+    percentiles = values.assign(
+        peer_percentile=grouped.rank(method="average", pct=True),
+        peer_size=grouped.transform("count"),
+    ).reset_index(drop=True)
+
+    distribution = pd.concat(
+        [
+            _distribution(values, keys),
+            _distribution(values.assign(peer_group=ALL_PEER_GROUP), keys),
+        ],
+        ignore_index=True,
+    )
+    return PeerStatsResult(percentiles=percentiles, distribution=distribution)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from app.analytics.indicators import SUBJECT_RULES, calculate_indicators
+from app.analytics.scoring import apply_scoring, calculate_overall_risk
+from app.analytics.subject_classifier import classify_subjects, rules_version
+from app.analytics.timeseries import calculate_time_series_indicators
+from app.core.metrics import StageTiming, collect_stage_timings, record_stage_timings, time_stage
+from app.storage.repository import (
+    fetch_companies,
+    fetch_facts_df,
+    fetch_subject_paths,
+    fetch_subject_rule_map,
+    save_subject_rule_map,
+)
+
+
+@dataclass
+class CalcResult:
+    metrics: pd.DataFrame
+    overall: pd.DataFrame
+    warnings: list[str]
+    stage_timings: list[StageTiming] = field(default_factory=list)
+
+
+def resolve_subject_map(db_path: str) -> pd.DataFrame:
+    version = rules_version(SUBJECT_RULES)
+    cached = fetch_subject_rule_map(db_path, version)
+    known = set(cached["subject_path"])
+    pending = [path for path in fetch_subject_paths(db_path) if path not in known]
+    if not pending:
+        return cached
+    classified = classify_subjects(pending, SUBJECT_RULES)
+    save_subject_rule_map(db_path, classified, version)
+    return pd.concat([cached, classified], ignore_index=True)
+
+
+def run_calc_pipeline(
+    facts_df: pd.DataFrame,
+    missing_value_strategy: str,
+    weights: dict[str, float],
+    subject_map: pd.DataFrame | None = None,
+) -> CalcResult:
+    with time_stage("calc", "indicators"):
+        indicator_result = calculate_indicators(
+            facts_df, missing_value_strategy=missing_value_strategy, subject_map=subject_map
+        )
+        time_series = calculate_time_series_indicators(indicator_result.base)
+        metrics = pd.concat([indicator_result.metrics, time_series], ignore_index=True)
+    with time_stage("calc", "scoring"):
+        scored = apply_scoring(metrics)
+    with time_stage("calc", "overall"):
+        overall_df = calculate_overall_risk(scored, weights)
+    return CalcResult(metrics=scored, overall=overall_df, warnings=indicator_result.warnings)
+
+
+def partition_companies(companies: list[str], shards: int) -> list[list[str]]:
+    shards = max(1, min(shards, len(companies)))
+    return [list(chunk) for chunk in np.array_split(np.array(companies, dtype=object), shards)]
+
+
+def _calc_shard(
+    db_path: str,
+    companies: list[str],
+    missing_value_strategy: str,
+    weights: dict[str, float],
+    subject_map: pd.DataFrame | None = None,
+) -> CalcResult:
+    # Each worker loads its own slice from SQLite, so facts never cross the process boundary.
+    with collect_stage_timings() as timings:
+        facts_df = fetch_facts_df(db_path, companies=companies)
+        result = run_calc_pipeline(facts_df, missing_value_strategy, weights, subject_map)
+    result.stage_timings = timings
+    return result
+
+
+def merge_results(results: list[CalcResult]) -> CalcResult:
+    metrics = [result.metrics for result in results if not result.metrics.empty]
+    overall = [result.overall for result in results if not result.overall.empty]
+    warnings = [warning for result in results for warning in result.warnings]
+    return CalcResult(
+        metrics=pd.concat(metrics, ignore_index=True) if metrics else pd.DataFrame(),
+        overall=pd.concat(overall, ignore_index=True) if overall else pd.DataFrame(),
+        warnings=warnings,
+    )
+
+
+def run_sharded_calc(
+    db_path: str,
+    missing_value_strategy: str,
+    weights: dict[str, float],
+    workers: int,
+) -> CalcResult:
+    subject_map = resolve_subject_map(db_path)
+    shards = partition_companies(fetch_companies(db_path), workers)
+    if len(shards) <= 1:
+        return _calc_shard(
+            db_path, shards[0] if shards else [], missing_value_strategy, weights, subject_map
+        )
+
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(
+                _calc_shard, db_path, shard, missing_value_strategy, weights, subject_map
+            )
+            for shard in shards
+        ]
+        results = [future.result() for future in futures]
+    # Shard stages ran in other processes; record them here so they reach this registry.
+    for result in results:
+        record_stage_timings(result.stage_timings)
+    return merge_results(results)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 
@@ -12,8 +13,30 @@ def top_n_companies(
 ) -> pd.DataFrame:
     subset = metrics_df[
         (metrics_df["indicator_name"] == indicator) & (metrics_df["year"] == year)
-    ].copy()
-    subset = subset.dropna(subset=["indicator_value"])
-    ascending = order == "asc"
-    subset = subset.sort_values("indicator_value", ascending=ascending)
-    return subset.head(n)
+    ]
+    values = subset["indicator_value"].to_numpy(dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))
+    keys = values[valid] if order == "asc" else -values[valid]
+    n = max(0, min(n, len(valid)))
+    if n == 0:
+        return subset.iloc[[]].copy()
+    # Keep every row tied with the n-th key so ties resolve in row order, as a stable sort would.
+    threshold = np.partition(keys, n - 1)[n - 1]
+    candidates = np.flatnonzero(keys <= threshold)
+    selected = candidates[np.argsort(keys[candidates], kind="stable")[:n]]
+    return subset.iloc[valid[selected]].copy()
+
+
+def build_ranking_index(metrics_df: pd.DataFrame) -> pd.DataFrame:
+    ranked = metrics_df.dropna(subset=["indicator_value"]).sort_values(
+        ["indicator_name", "year", "indicator_value", "company_name"],
+        ascending=[True, True, False, True],
+        kind="stable",
+    )
+    grouped = ranked.groupby(["indicator_name", "year"], sort=False)["indicator_value"]
+    ranked = ranked.assign(
+        ordinal_rank=grouped.cumcount() + 1,
+        dense_rank=grouped.rank(method="dense", ascending=False).astype(int),
+        percentile=grouped.rank(method="max", pct=True),
+    )
+    return ranked.reset_index(drop=True)
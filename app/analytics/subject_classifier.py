@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Iterable
+
+import pandas as pd
+
+MAPPING_COLUMNS = ["subject_path", "rule_name"]
+
+
+def rules_version(rules: dict[str, list[str]]) -> str:
+    payload = json.dumps(rules, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def classify_subjects(subject_paths: Iterable[str], rules: dict[str, list[str]]) -> pd.DataFrame:
+    keyword_index = [
+        (keyword, rule_name) for rule_name, keywords in rules.items() for keyword in keywords
+    ]
+    rows: list[tuple[str, str | None]] = []
+    for subject_path in dict.fromkeys(subject_paths):
+        if not isinstance(subject_path, str):
+            continue
+        matched = dict.fromkeys(
+            rule_name for keyword, rule_name in keyword_index if keyword in subject_path
+        )
+        # Unmatched paths keep a null rule so a cached mapping remembers them too.
+        if matched:
+            rows.extend((subject_path, rule_name) for rule_name in matched)
+        else:
+            rows.append((subject_path, None))
+    return pd.DataFrame(rows, columns=MAPPING_COLUMNS)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.analytics.indicators import INDICATOR_DEFINITIONS
+
+GROWTH_SOURCES = {"revenue": "营业收入", "net_profit": "净利润"}
+CAGR_WINDOWS = (3, 5)
+ROLLING_WINDOWS = (3, 5)
+
+
+def _lag(frame: pd.DataFrame, years: int) -> pd.DataFrame:
+    # Align on calendar years rather than row position so gaps never pair non-adjacent years.
+    lagged = frame.copy()
+    lagged.index = pd.MultiIndex.from_arrays(
+        [
+            frame.index.get_level_values("company_name"),
+            frame.index.get_level_values("year") + years,
+        ],
+        names=frame.index.names,
+    )
+    return lagged.reindex(frame.index)
+
+
+def _long(values: pd.Series, indicator_name: str, details: dict) -> pd.DataFrame:
+    values = values.dropna()
+    return pd.DataFrame(
+        {
+            "company_name": values.index.get_level_values("company_name"),
+            "year": values.index.get_level_values("year").astype(int),
+            "indicator_name": indicator_name,
+            "indicator_value": values.to_numpy(dtype=float),
+            "details": json.dumps(details, ensure_ascii=False),
+        }
+    )
+
+
+def calculate_time_series_indicators(base: pd.DataFrame) -> pd.DataFrame:
+    base = base.sort_index()
+    frames: list[pd.DataFrame] = []
+
+    previous = _lag(base, 1)
+    for source, label in GROWTH_SOURCES.items():
+        current, prior = base[source], previous[source]
+        yoy = (current - prior) / prior.abs()
+        frames.append(
+            _long(
+                yoy.where(prior != 0),
+                f"{source}_yoy",
+                {"label": f"{label}同比增长率", "window": 1},
+            )
+        )
+
+    for window in CAGR_WINDOWS:
+        start = _lag(base, window)
+        for source, label in GROWTH_SOURCES.items():
+            current, initial = base[source], start[source]
+            valid = (current > 0) & (initial > 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cagr = (current / initial) ** (1 / window) - 1
+            frames.append(
+                _long(
+                    cagr.where(valid),
+                    f"{source}_cagr_{window}y",
+                    {"label": f"{label}{window}年复合增长率", "window": window},
+                )
+            )
+
+    ratios = base[list(INDICATOR_DEFINITIONS)]
+    for window in ROLLING_WINDOWS:
+        lags = [_lag(ratios, offset) for offset in range(window)]
+        rolling = sum(lags[1:], lags[0]) / window
+        for indicator_name, (_, _, label) in INDICATOR_DEFINITIONS.items():
+            frames.append(
+                _long(
+                    rolling[indicator_name],
+                    f"{indicator_name}_avg_{window}y",
+                    {"label": f"{label}{window}年均值", "window": window},
+                )
+            )
+
+    return pd.concat(frames, ignore_index=True)
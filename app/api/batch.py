@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, Literal
+
+import pandas as pd
+from pydantic import BaseModel, ValidationError
+
+from app.analytics.drilldown import drilldown_facts
+from app.core.errors import AppError, ErrorCode
+from app.storage.repository import (
+    DbSource,
+    fetch_facts,
+    query_metrics,
+    query_ranking,
+    read_snapshot,
+)
+
+
+class QueryParams(BaseModel):
+    company: str | None = None
+    year: int | None = None
+    indicator: str | None = None
+
+
+class RankParams(BaseModel):
+    indicator: str
+    year: int
+    n: int = 5
+    order: Literal["desc", "asc"] = "desc"
+
+
+class DrilldownParams(BaseModel):
+    company: str
+    year: int
+    statement_type: str
+    subject_prefix: str
+
+
+class BatchRequest(BaseModel):
+    op: str
+    params: dict[str, Any] = {}
+
+
+class BatchPayload(BaseModel):
+    requests: list[BatchRequest]
+
+
+def _query(db: DbSource, params: QueryParams) -> list[dict[str, Any]]:
+    return query_metrics(db, params.company, params.year, params.indicator)
+
+
+def _rank(db: DbSource, params: RankParams) -> list[dict[str, Any]]:
+    ranking = query_ranking(db, params.indicator, params.year, n=params.n, order=params.order)
+    return ranking.to_dict(orient="records")
+
+
+def _drilldown(db: DbSource, params: DrilldownParams) -> list[dict[str, Any]]:
+    facts = fetch_facts(
+        db, params.company, params.year, params.statement_type, params.subject_prefix
+    )
+    if not facts:
+        return []
+    result = drilldown_facts(
+        pd.DataFrame(facts),
+        params.company,
+        params.year,
+        params.statement_type,
+        params.subject_prefix,
+    )
+    return result.to_dict(orient="records")
+
+
+BATCH_OPERATIONS: dict[str, tuple[type[BaseModel], Callable[[DbSource, Any], list[dict]]]] = {
+    "query": (QueryParams, _query),
+    "rank": (RankParams, _rank),
+    "drilldown": (DrilldownParams, _drilldown),
+}
+
+
+def _item_error(error: AppError) -> dict[str, Any]:
+    return {"code": int(error.code), "message": error.message, "data": error.to_dict()}
+
+
+def _prepare_item(
+    request: BatchRequest,
+) -> tuple[Callable[[DbSource, Any], list[dict]], BaseModel]:
+    operation = BATCH_OPERATIONS.get(request.op)
+    if operation is None:
+        raise AppError(
+            code=ErrorCode.UNSUPPORTED_TYPE,
+            message=f"Unsupported batch operation: {request.op}.",
+            details={"supported": sorted(BATCH_OPERATIONS)},
+        )
+    model, handler = operation
+    try:
+        return handler, model.model_validate(request.params)
+    except ValidationError as exc:
+        raise AppError(
+            code=ErrorCode.INVALID_REQUEST,
+            message="Invalid batch item parameters.",
+            details={"errors": exc.errors(include_url=False)},
+        ) from exc
+
+
+def _run_item(
+    db: DbSource, handler: Callable[[DbSource, Any], list[dict]], params: BaseModel
+) -> dict[str, Any]:
+    try:
+        items = handler(db, params)
+    except AppError as exc:
+        return _item_error(exc)
+    return {"code": int(ErrorCode.SUCCESS), "message": "success", "data": {"items": items}}
+
+
+def execute_batch(db_path: str, requests: list[BatchRequest]) -> list[dict[str, Any]]:
+    results: dict[tuple[str, str], dict[str, Any]] = {}
+    responses: list[dict[str, Any]] = []
+    with read_snapshot(db_path) as conn:
+        for request in requests:
+            try:
+                handler, params = _prepare_item(request)
+            except AppError as exc:
+                responses.append(_item_error(exc))
+                continue
+            # Dedup on the validated values that actually run, so one key is always one query.
+            key = (request.op, params.model_dump_json())
+            if key not in results:
+                results[key] = _run_item(conn, handler, params)
+            responses.append(results[key])
+    return responses
@@ -1,20 +1,156 @@
 from __future__ import annotations
 
 import time
+from collections.abc import Callable, Iterator
 from typing import Any
 
 import pandas as pd
-from fastapi import APIRouter, Body, Request
+from fastapi import APIRouter, Body, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse
 
 from app.analytics.drilldown import drilldown_facts
-from app.analytics.ranking import top_n_companies
+from app.api.batch import BatchPayload, execute_batch
+from app.api.uploads import spool_uploads
 from app.config import get_settings
+from app.core.cache import GenerationTracker, ResultCache, make_cache_key, normalize_params
+from app.core.columnar import COLUMNAR_MEDIA_TYPES, columnar_response, encode_frame
 from app.core.errors import AppError, ErrorCode
-from app.core.response import success_response
-from app.storage.repository import fetch_facts, fetch_metrics_df, query_metrics
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
+from app.core.response import (
+    compute_etag,
+    etag_matches,
+    ndjson_response,
+    negotiate_format,
+    not_modified_response,
+    success_response,
+)
+from app.jobs.manager import JOB_SUCCEEDED, JobManager, job_directory, new_job_id
+from app.jobs.tasks import UPLOAD_DIRNAME, UPLOAD_JOB_KIND, JobSubmission, validate_job_params
+from app.storage.async_repository import (
+    query_peer_distribution_async,
+    query_peer_percentiles_async,
+    run_in_db_executor,
+)
+from app.storage.db import database_signature
+from app.storage.repository import (
+    fetch_data_generation,
+    fetch_facts,
+    fetch_facts_frame,
+    fetch_metrics_frame,
+    iter_facts,
+    iter_metrics,
+    query_metrics,
+    query_ranking,
+)
 
 router = APIRouter()
 settings = get_settings()
+result_cache = ResultCache(
+    max_entries=settings.cache_max_entries,
+    ttl_seconds=settings.cache_ttl_seconds,
+    max_bytes=settings.cache_max_bytes,
+)
+
+job_manager = JobManager(
+    max_workers=settings.job_max_workers,
+    kind_limits=settings.job_kind_limits,
+    history_limit=settings.job_history_limit,
+)
+REGISTRY.register_collector(result_cache.collect_metrics)
+REGISTRY.register_collector(job_manager.collect_metrics)
+# A conditional request whose database file is unchanged on disk gets its 304 from the
+# cached generation without opening SQLite.
+generation_tracker = GenerationTracker(
+    lambda: fetch_data_generation(settings.db_path),
+    max_age_seconds=settings.generation_max_age_seconds,
+    signature=lambda: database_signature(settings.db_path),
+)
+
+
+async def _current_generation() -> str:
+    generation = generation_tracker.cached()
+    if generation is None:
+        generation = await run_in_db_executor(generation_tracker.refresh)
+    return generation
+
+
+def _columnar_content(
+    frame_loader: Callable[..., pd.DataFrame], fmt: str, params: dict[str, Any]
+) -> bytes:
+    return encode_frame(frame_loader(settings.db_path, **params), fmt)
+
+
+async def _items_response(
+    request: Request,
+    kind: str,
+    params: dict[str, Any],
+    loader: Callable[..., list[dict[str, Any]]],
+    streamer: Callable[..., Iterator[list[dict[str, Any]]]] | None = None,
+    frame_loader: Callable[..., pd.DataFrame] | None = None,
+    stream: bool = False,
+    fmt: str | None = None,
+) -> Response:
+    supported: list[str] = []
+    if streamer is not None:
+        supported.append("ndjson")
+    if frame_loader is not None:
+        supported.extend(COLUMNAR_MEDIA_TYPES)
+    response_format = negotiate_format(request, fmt, stream, supported)
+    generation = await _current_generation()
+    etag_kind = kind if response_format == "json" else f"{kind}:{response_format}"
+    etag = compute_etag(generation, etag_kind, normalize_params(params))
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return not_modified_response(etag)
+    if response_format == "ndjson":
+        return ndjson_response(streamer(settings.db_path, **params), etag=etag)
+    if response_format in COLUMNAR_MEDIA_TYPES:
+        content = await run_in_db_executor(_columnar_content, frame_loader, response_format, params)
+        return columnar_response(content, response_format, etag=etag)
+
+    result_cache.sync_generation(generation)
+    key = make_cache_key(kind, params, generation)
+    hit, items = result_cache.get(key)
+    if not hit:
+        items = await run_in_db_executor(loader, **params)
+        result_cache.set(key, items, generation=generation)
+    return success_response({"items": items}, etag=etag)
+
+
+def _load_metrics(
+    company: str | None = None,
+    year: int | None = None,
+    indicator: str | None = None,
+    columns: tuple[str, ...] | None = None,
+) -> list[dict[str, Any]]:
+    return query_metrics(settings.db_path, company, year, indicator, columns)
+
+
+def _load_facts(
+    company: str | None = None,
+    year: int | None = None,
+    statement_type: str | None = None,
+    subject_prefix: str | None = None,
+    columns: tuple[str, ...] | None = None,
+) -> list[dict[str, Any]]:
+    return fetch_facts(settings.db_path, company, year, statement_type, subject_prefix, columns)
+
+
+def _load_ranking(
+    indicator: str, year: int, n: int = 5, order: str = "desc"
+) -> list[dict[str, Any]]:
+    ranking = query_ranking(settings.db_path, indicator, year, n=n, order=order)
+    return ranking.to_dict(orient="records")
+
+
+def _load_drilldown(
+    company: str, year: int, statement_type: str, subject_prefix: str = ""
+) -> list[dict[str, Any]]:
+    # Filter in SQL; drilldown_facts then only sees the rows it would keep.
+    facts = fetch_facts(settings.db_path, company, year, statement_type, subject_prefix)
+    if not facts:
+        return []
+    result = drilldown_facts(pd.DataFrame(facts), company, year, statement_type, subject_prefix)
+    return result.to_dict(orient="records")
 
 
 @router.get("/health")
@@ -28,43 +164,167 @@ async def health(request: Request) -> Any:
     return success_response(payload)
 
 
+@router.get("/metrics")
+async def metrics_api() -> Any:
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/cache/stats")
+async def cache_stats() -> Any:
+    return success_response(result_cache.stats())
+
+
 @router.post("/query")
 async def query_metrics_api(
+    request: Request,
     company: str | None = Body(default=None),
     year: int | None = Body(default=None),
     indicator: str | None = Body(default=None),
+    columns: list[str] | None = Body(default=None),
+    stream: bool = Query(default=False),
+    fmt: str | None = Query(default=None, alias="format"),
 ) -> Any:
-    data = query_metrics(settings.db_path, company, year, indicator)
-    return success_response({"items": data})
+    params = {"company": company, "year": year, "indicator": indicator, "columns": columns}
+    return await _items_response(
+        request,
+        "query",
+        params,
+        _load_metrics,
+        streamer=iter_metrics,
+        frame_loader=fetch_metrics_frame,
+        stream=stream,
+        fmt=fmt,
+    )
+
+
+@router.post("/facts")
+async def facts_api(
+    request: Request,
+    company: str | None = Body(default=None),
+    year: int | None = Body(default=None),
+    statement_type: str | None = Body(default=None),
+    subject_prefix: str | None = Body(default=None),
+    columns: list[str] | None = Body(default=None),
+    stream: bool = Query(default=False),
+    fmt: str | None = Query(default=None, alias="format"),
+) -> Any:
+    params = {
+        "company": company,
+        "year": year,
+        "statement_type": statement_type,
+        "subject_prefix": subject_prefix,
+        "columns": columns,
+    }
+    return await _items_response(
+        request,
+        "facts",
+        params,
+        _load_facts,
+        streamer=iter_facts,
+        frame_loader=fetch_facts_frame,
+        stream=stream,
+        fmt=fmt,
+    )
 
 
 @router.post("/rank")
 async def rank_metrics_api(
+    request: Request,
     indicator: str = Body(...),
     year: int = Body(...),
     n: int = Body(default=5),
     order: str = Body(default="desc"),
 ) -> Any:
-    metrics_df = fetch_metrics_df(settings.db_path)
-    if metrics_df.empty:
+    params = {"indicator": indicator, "year": year, "n": n, "order": order}
+    return await _items_response(request, "rank", params, _load_ranking)
+
+
+@router.post("/batch")
+async def batch_api(payload: BatchPayload) -> Any:
+    if len(payload.requests) > settings.batch_max_items:
         raise AppError(
-            code=ErrorCode.VALIDATION_ERROR,
-            message="No metrics found. Run calc first.",
+            code=ErrorCode.INVALID_REQUEST,
+            message=f"Batch accepts at most {settings.batch_max_items} requests.",
             status_code=400,
         )
-    ranking = top_n_companies(metrics_df, indicator, year, n=n, order=order)
-    return success_response({"items": ranking.to_dict(orient="records")})
+    items = await run_in_db_executor(execute_batch, settings.db_path, payload.requests)
+    return success_response({"items": items})
+
+
+@router.post("/peers/percentiles")
+async def peer_percentiles_api(
+    company: str | None = Body(default=None),
+    year: int | None = Body(default=None),
+    indicator: str | None = Body(default=None),
+    peer_group: str | None = Body(default=None),
+) -> Any:
+    data = await query_peer_percentiles_async(
+        settings.db_path, company, year, indicator, peer_group
+    )
+    return success_response({"items": data})
+
+
+@router.post("/peers/distribution")
+async def peer_distribution_api(
+    year: int | None = Body(default=None),
+    indicator: str | None = Body(default=None),
+    peer_group: str | None = Body(default=None),
+) -> Any:
+    data = await query_peer_distribution_async(settings.db_path, year, indicator, peer_group)
+    return success_response({"items": data})
 
 
 @router.post("/drilldown")
 async def drilldown_api(
+    request: Request,
     company: str = Body(...),
     year: int = Body(...),
     statement_type: str = Body(...),
     subject_prefix: str = Body(...),
+    stream: bool = Query(default=False),
 ) -> Any:
-    facts_df = fetch_facts(settings.db_path)
-    result = drilldown_facts(
-        pd.DataFrame(facts_df), company, year, statement_type, subject_prefix
+    params = {
+        "company": company,
+        "year": year,
+        "statement_type": statement_type,
+        "subject_prefix": subject_prefix,
+    }
+    return await _items_response(
+        request, "drilldown", params, _load_drilldown, streamer=iter_facts, stream=stream
+    )
+
+
+@router.post("/jobs/{kind}")
+async def submit_job_api(kind: str, submission: JobSubmission) -> Any:
+    validated = validate_job_params(kind, submission.params)
+    job = job_manager.submit(kind, validated, settings.db_path, settings.output_dir)
+    return success_response(job.to_dict())
+
+
+@router.post("/ingest/upload")
+async def upload_ingest_api(files: list[UploadFile]) -> Any:
+    job_id = new_job_id()
+    spool_dir = job_directory(settings.output_dir, job_id) / UPLOAD_DIRNAME
+    uploaded = await spool_uploads(files, spool_dir, settings.upload_max_bytes)
+    job = job_manager.submit(
+        UPLOAD_JOB_KIND, {}, settings.db_path, settings.output_dir, job_id=job_id
     )
-    return success_response({"items": result.to_dict(orient="records")})
+    return success_response({**job.to_dict(), "files": uploaded})
+
+
+@router.get("/jobs/{job_id}")
+async def job_status_api(job_id: str) -> Any:
+    return success_response(job_manager.get(job_id).to_dict())
+
+
+@router.get("/jobs/{job_id}/artifact")
+async def job_artifact_api(job_id: str) -> Any:
+    job = job_manager.get(job_id)
+    if job.status != JOB_SUCCEEDED or job.artifact is None or not job.artifact.exists():
+        raise AppError(
+            code=ErrorCode.INVALID_REQUEST,
+            message=f"Job {job_id} has no artifact to download.",
+            status_code=409,
+            details={"status": job.status},
+        )
+    return FileResponse(job.artifact, filename=job.artifact.name)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.errors import AppError, ErrorCode
+from app.ingest.excel_reader import validate_company_workbook
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _upload_name(upload: UploadFile) -> str:
+    name = Path(upload.filename or "").name
+    if Path(name).suffix.lower() != ".xlsx" or not Path(name).stem:
+        raise AppError(
+            code=ErrorCode.UNSUPPORTED_TYPE,
+            message=f"Only .xlsx workbooks can be uploaded: {upload.filename}.",
+            status_code=400,
+        )
+    return name
+
+
+async def _spool(upload: UploadFile, target: Path, max_bytes: int) -> int:
+    written = 0
+    with target.open("wb") as handle:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > max_bytes:
+                raise AppError(
+                    code=ErrorCode.INVALID_REQUEST,
+                    message=f"Upload {target.name} exceeds {max_bytes} bytes.",
+                    status_code=413,
+                )
+            await run_in_threadpool(handle.write, chunk)
+    return written
+
+
+async def spool_uploads(uploads: list[UploadFile], spool_dir: Path, max_bytes: int) -> list[dict]:
+    if not uploads:
+        raise AppError(
+            code=ErrorCode.INVALID_REQUEST,
+            message="No workbooks uploaded.",
+            status_code=400,
+        )
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    files: list[dict] = []
+    try:
+        for upload in uploads:
+            name = _upload_name(upload)
+            target = spool_dir / name
+            if target.exists():
+                raise AppError(
+                    code=ErrorCode.INVALID_REQUEST,
+                    message=f"Duplicate workbook in upload: {name}.",
+                    status_code=400,
+                )
+            size = await _spool(upload, target, max_bytes)
+            try:
+                await run_in_threadpool(validate_company_workbook, target)
+            except AppError as exc:
+                exc.details = {**(exc.details or {}), "file": name}
+                raise
+            files.append({"company_name": target.stem, "file": name, "bytes": size})
+    except BaseException:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+        raise
+    return files
@@ -1,42 +1,31 @@
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 from collections.abc import Callable
-from pathlib import Path
 from typing import Any
 
-import pandas as pd
-
-from app.analytics.drilldown import drilldown_facts
-from app.analytics.indicators import calculate_indicators
-from app.analytics.ranking import top_n_companies
-from app.analytics.scoring import apply_scoring, calculate_overall_risk
 from app.config import get_settings
 from app.core.errors import AppError, ErrorCode
 from app.core.logging import generate_trace_id, set_trace_id
 from app.core.response import build_error_data, build_response_data
-from app.ingest.excel_reader import read_company_excel
-from app.ingest.normalizer import normalize_statement
-from app.reporting.excel_report import export_excel_report
-from app.reporting.ppt_report import export_ppt_report
-from app.reporting.template_generator import ensure_template
-from app.storage.repository import (
-    fetch_facts,
-    fetch_metrics_df,
-    fetch_overall_df,
-    ingest_facts,
-    query_metrics,
-    replace_metrics,
+from app.core.serialization import dumps
+from app.reporting.template_generator import DEFAULT_TEMPLATE_PATH
+from app.services import (
+    calc_command,
+    drilldown_command,
+    export_excel_command,
+    export_html_command,
+    export_ppt_command,
+    ingest_command,
+    peers_command,
+    query_command,
+    rank_command,
 )
 
 
 def _emit(data: dict[str, Any], json_output: bool) -> None:
-    if json_output:
-        print(json.dumps(data, ensure_ascii=False, indent=2))
-    else:
-        print(json.dumps(data, ensure_ascii=False))
+    print(dumps(data, indent=json_output).decode("utf-8"))
 
 
 def _handle_command(func: Callable[..., dict[str, Any]], json_output: bool, **kwargs: Any) -> int:
@@ -62,158 +51,80 @@ def _handle_command(func: Callable[..., dict[str, Any]], json_output: bool, **kw
         return 1
 
 
-def ingest_command(input_dir: str, db_path: str, reset: bool) -> dict[str, Any]:
-    input_path = Path(input_dir)
-    if reset and Path(db_path).exists():
-        Path(db_path).unlink()
-
-    all_facts = []
-    for excel_file in input_path.glob("*.xlsx"):
-        company_name = excel_file.stem
-        sheets = read_company_excel(excel_file)
-        for statement_type, df in sheets.items():
-            facts = normalize_statement(company_name, statement_type, df)
-            all_facts.append(facts)
-
-    if not all_facts:
-        raise AppError(
-            code=ErrorCode.INVALID_REQUEST,
-            message="No Excel files found for ingestion.",
-            status_code=400,
-        )
+def _csv(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
 
-    facts_df = pd.concat(all_facts, ignore_index=True)
-    total_rows = ingest_facts(db_path, facts_df)
-    return {"ingested_rows": total_rows}
 
+def _int_csv(value: str) -> list[int]:
+    return [int(item) for item in _csv(value)]
 
-def calc_command(db_path: str, missing_strategy: str) -> dict[str, Any]:
-    facts_records = fetch_facts(db_path)
-    facts_df = pd.DataFrame(facts_records)
-    if facts_df.empty:
-        raise AppError(
-            code=ErrorCode.VALIDATION_ERROR,
-            message="No facts found. Run ingest first.",
-            status_code=400,
-        )
-
-    indicator_result = calculate_indicators(facts_df, missing_value_strategy=missing_strategy)
-    scored = apply_scoring(indicator_result.metrics)
-    settings = get_settings()
-    overall_df = calculate_overall_risk(scored, settings.indicator_weights)
-    replace_metrics(db_path, scored, overall_df)
-    return {"metrics_rows": len(scored), "warnings": indicator_result.warnings}
 
-
-def query_command(db_path: str, company: str | None, year: int | None, indicator: str | None) -> dict[str, Any]:
-    return {"items": query_metrics(db_path, company, year, indicator)}
-
-
-def rank_command(db_path: str, indicator: str, year: int, n: int, order: str) -> dict[str, Any]:
-    metrics_df = fetch_metrics_df(db_path)
-    if metrics_df.empty:
-        raise AppError(
-            code=ErrorCode.VALIDATION_ERROR,
-            message="No metrics found. Run calc first.",
-            status_code=400,
-        )
-    ranking_df = top_n_companies(metrics_df, indicator, year, n=n, order=order)
-    return {"items": ranking_df.to_dict(orient="records")}
-
-
-def drilldown_command(
-    db_path: str,
-    company: str,
-    year: int,
-    statement_type: str,
-    subject_prefix: str,
-) -> dict[str, Any]:
-    facts_records = fetch_facts(db_path)
-    facts_df = pd.DataFrame(facts_records)
-    result = drilldown_facts(facts_df, company, year, statement_type, subject_prefix)
-    return {"items": result.to_dict(orient="records")}
-
-
-def export_excel_command(
-    db_path: str,
-    output_path: str,
-    indicator: str,
-    year: int,
-    n: int,
-    company: str | None,
-    statement_type: str | None,
-    subject_prefix: str | None,
-) -> dict[str, Any]:
-    metrics_df = fetch_metrics_df(db_path)
-    ranking_df = top_n_companies(metrics_df, indicator, year, n=n)
-    drilldown_df = None
-    if company and statement_type and subject_prefix:
-        facts_df = pd.DataFrame(fetch_facts(db_path))
-        drilldown_df = drilldown_facts(facts_df, company, year, statement_type, subject_prefix)
-    output_file = export_excel_report(metrics_df, ranking_df, drilldown_df, Path(output_path))
-    return {"path": str(output_file)}
-
-
-def export_ppt_command(
-    db_path: str,
-    output_path: str,
-    assets_dir: str,
-    template_path: str,
-    indicator: str,
-    year: int,
-    n: int,
-) -> dict[str, Any]:
-    metrics_df = fetch_metrics_df(db_path)
-    overall_df = fetch_overall_df(db_path)
-    ranking_df = top_n_companies(metrics_df, indicator, year, n=n)
-    template_file = ensure_template(Path(template_path))
-    output_file = export_ppt_report(
-        metrics_df,
-        overall_df,
-        Path(output_path),
-        Path(assets_dir),
-        template_file,
-        ranking_df,
-    )
-    return {"path": str(output_file)}
+def _add_scope_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--companies", type=_csv, help="Comma-separated company names")
+    parser.add_argument("--years", type=_int_csv, help="Comma-separated years")
+    parser.add_argument("--indicators", type=_csv, help="Comma-separated indicator names")
 
 
 def build_parser() -> argparse.ArgumentParser:
     settings = get_settings()
     parser = argparse.ArgumentParser(description="Financial risk analysis CLI")
     parser.add_argument("--json", action="store_true", help="Output JSON format")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--json", action="store_true", default=argparse.SUPPRESS, help="Output JSON format"
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    ingest_parser = subparsers.add_parser("ingest", help="Ingest Excel files")
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest Excel files", parents=[common])
     ingest_parser.add_argument("--input-dir", default=settings.input_dir)
     ingest_parser.add_argument("--db-path", default=settings.db_path)
     ingest_parser.add_argument("--reset", action="store_true")
+    ingest_parser.add_argument("--profiles-path")
 
-    calc_parser = subparsers.add_parser("calc", help="Calculate indicators and risk")
+    calc_parser = subparsers.add_parser(
+        "calc", help="Calculate indicators and risk", parents=[common]
+    )
     calc_parser.add_argument("--db-path", default=settings.db_path)
     calc_parser.add_argument("--missing-strategy", default=settings.missing_value_strategy)
+    calc_parser.add_argument("--workers", type=int, default=1)
 
-    query_parser = subparsers.add_parser("query", help="Query metrics")
+    query_parser = subparsers.add_parser("query", help="Query metrics", parents=[common])
     query_parser.add_argument("--db-path", default=settings.db_path)
     query_parser.add_argument("--company")
     query_parser.add_argument("--year", type=int)
     query_parser.add_argument("--indicator")
 
-    rank_parser = subparsers.add_parser("rank", help="Rank companies by indicator")
+    rank_parser = subparsers.add_parser(
+        "rank", help="Rank companies by indicator", parents=[common]
+    )
     rank_parser.add_argument("--db-path", default=settings.db_path)
     rank_parser.add_argument("--indicator", required=True)
     rank_parser.add_argument("--year", type=int, required=True)
     rank_parser.add_argument("--n", type=int, default=5)
     rank_parser.add_argument("--order", default="desc", choices=["desc", "asc"])
 
-    drill_parser = subparsers.add_parser("drilldown", help="Drilldown facts")
+    peers_parser = subparsers.add_parser(
+        "peers", help="Query peer-group percentiles and distributions", parents=[common]
+    )
+    peers_parser.add_argument("--db-path", default=settings.db_path)
+    peers_parser.add_argument(
+        "--view", default="percentiles", choices=["percentiles", "distribution"]
+    )
+    peers_parser.add_argument("--company")
+    peers_parser.add_argument("--year", type=int)
+    peers_parser.add_argument("--indicator")
+    peers_parser.add_argument("--peer-group")
+
+    drill_parser = subparsers.add_parser("drilldown", help="Drilldown facts", parents=[common])
     drill_parser.add_argument("--db-path", default=settings.db_path)
     drill_parser.add_argument("--company", required=True)
     drill_parser.add_argument("--year", type=int, required=True)
     drill_parser.add_argument("--statement-type", required=True)
     drill_parser.add_argument("--subject-prefix", required=True)
 
-    excel_parser = subparsers.add_parser("export_excel", help="Export Excel report")
+    excel_parser = subparsers.add_parser(
+        "export_excel", help="Export Excel report", parents=[common]
+    )
     excel_parser.add_argument("--db-path", default=settings.db_path)
     excel_parser.add_argument("--output-path", default=f"{settings.output_dir}/report.xlsx")
     excel_parser.add_argument("--indicator", default="net_profit_margin")
@@ -222,17 +133,34 @@ def build_parser() -> argparse.ArgumentParser:
     excel_parser.add_argument("--company")
     excel_parser.add_argument("--statement-type")
     excel_parser.add_argument("--subject-prefix")
+    excel_parser.add_argument("--bundle-dir")
+    excel_parser.add_argument("--zip", action="store_true")
+    excel_parser.add_argument("--workers", type=int, default=1)
+    _add_scope_arguments(excel_parser)
 
-    ppt_parser = subparsers.add_parser("export_ppt", help="Export PPT report")
+    ppt_parser = subparsers.add_parser("export_ppt", help="Export PPT report", parents=[common])
     ppt_parser.add_argument("--db-path", default=settings.db_path)
     ppt_parser.add_argument("--output-path", default=f"{settings.output_dir}/report.pptx")
     ppt_parser.add_argument("--assets-dir", default=f"{settings.output_dir}/assets")
-    ppt_parser.add_argument(
-        "--template-path", default="app/reporting/templates/report_template.pptx"
-    )
+    ppt_parser.add_argument("--template-path", default=str(DEFAULT_TEMPLATE_PATH))
     ppt_parser.add_argument("--indicator", default="net_profit_margin")
     ppt_parser.add_argument("--year", type=int, required=True)
     ppt_parser.add_argument("--n", type=int, default=5)
+    ppt_parser.add_argument("--workers", type=int, default=1)
+    ppt_parser.add_argument("--bundle-dir")
+    ppt_parser.add_argument("--zip", action="store_true")
+    ppt_parser.add_argument("--incremental", action="store_true")
+    _add_scope_arguments(ppt_parser)
+
+    html_parser = subparsers.add_parser(
+        "export_html", help="Export static HTML dashboard", parents=[common]
+    )
+    html_parser.add_argument("--db-path", default=settings.db_path)
+    html_parser.add_argument("--output-path", default=f"{settings.output_dir}/report.html")
+    html_parser.add_argument("--indicator", default="net_profit_margin")
+    html_parser.add_argument("--year", type=int, required=True)
+    html_parser.add_argument("--n", type=int, default=5)
+    _add_scope_arguments(html_parser)
 
     return parser
 
@@ -249,6 +177,7 @@ def main() -> int:
             input_dir=args.input_dir,
             db_path=args.db_path,
             reset=args.reset,
+            profiles_path=args.profiles_path,
         )
 
     if args.command == "calc":
@@ -257,6 +186,7 @@ def main() -> int:
             json_output,
             db_path=args.db_path,
             missing_strategy=args.missing_strategy,
+            workers=args.workers,
         )
 
     if args.command == "query":
@@ -280,6 +210,18 @@ def main() -> int:
             order=args.order,
         )
 
+    if args.command == "peers":
+        return _handle_command(
+            peers_command,
+            json_output,
+            db_path=args.db_path,
+            view=args.view,
+            company=args.company,
+            year=args.year,
+            indicator=args.indicator,
+            peer_group=args.peer_group,
+        )
+
     if args.command == "drilldown":
         return _handle_command(
             drilldown_command,
@@ -303,6 +245,12 @@ def main() -> int:
             company=args.company,
             statement_type=args.statement_type,
             subject_prefix=args.subject_prefix,
+            workers=args.workers,
+            bundle_dir=args.bundle_dir,
+            zip_bundle=args.zip,
+            companies=args.companies,
+            years=args.years,
+            indicators=args.indicators,
         )
 
     if args.command == "export_ppt":
@@ -316,6 +264,27 @@ def main() -> int:
             indicator=args.indicator,
             year=args.year,
             n=args.n,
+            workers=args.workers,
+            bundle_dir=args.bundle_dir,
+            zip_bundle=args.zip,
+            companies=args.companies,
+            years=args.years,
+            indicators=args.indicators,
+            incremental=args.incremental,
+        )
+
+    if args.command == "export_html":
+        return _handle_command(
+            export_html_command,
+            json_output,
+            db_path=args.db_path,
+            output_path=args.output_path,
+            indicator=args.indicator,
+            year=args.year,
+            n=args.n,
+            companies=args.companies,
+            years=args.years,
+            indicators=args.indicators,
         )
 
     return 0
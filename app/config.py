@@ -16,6 +16,26 @@ class AppSettings(BaseSettings):
     output_dir: str = "data/output"
     db_path: str = "data/output/finance.db"
     missing_value_strategy: str = "warn"  # warn | error
+    db_max_workers: int = 8
+
+    cache_max_entries: int = 1024
+    cache_ttl_seconds: float = 60.0
+    cache_max_bytes: int = 64 * 1024 * 1024
+    generation_max_age_seconds: float = 0.0
+    batch_max_items: int = 50
+
+    job_max_workers: int = 2
+    job_kind_limits: dict[str, int] = {
+        "ingest": 1,
+        "ingest_upload": 2,
+        "calc": 1,
+        "export_excel": 1,
+        "export_ppt": 1,
+        "export_html": 2,
+    }
+    job_history_limit: int = 200
+    upload_max_bytes: int = 50 * 1024 * 1024
+    chart_cache_max_bytes: int = 256 * 1024 * 1024
 
     indicator_weights: dict[str, float] = {
         "net_profit_margin": 0.4,
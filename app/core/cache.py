@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.core.metrics import MetricFamily
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+def estimate_size(value: Any) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+def normalize_params(params: dict[str, Any]) -> dict[str, Any]:
+    # Only rewrites that cannot change a query's result: sorted names, None dropped
+    # (loaders default every filter to None) and lists made hashable.
+    normalized: dict[str, Any] = {}
+    for name in sorted(params):
+        value = params[name]
+        if value is None:
+            continue
+        if isinstance(value, list):
+            value = tuple(value)
+        normalized[name] = value
+    return normalized
+
+
+def make_cache_key(
+    kind: str, params: dict[str, Any], generation: Hashable = None
+) -> tuple[Hashable, ...]:
+    return (generation, kind, tuple(normalize_params(params).items()))
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_bytes: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._generation: Hashable = None
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def sync_generation(self, generation: Hashable) -> None:
+        with self._lock:
+            if generation == self._generation:
+                return
+            if self._entries:
+                self._stats.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._generation = generation
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return False, None
+            if entry.expires_at <= self._clock():
+                self._drop(key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return True, entry.value
+
+    def set(self, key: Hashable, value: Any, generation: Hashable = None) -> None:
+        if not self.enabled:
+            return
+        size = estimate_size(value)
+        with self._lock:
+            # A result loaded before a data change must not be stored under the new generation.
+            if generation is not None and generation != self._generation:
+                return
+            if size > self.max_bytes:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(value, size, self._clock() + self.ttl_seconds)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **asdict(self._stats),
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "generation": self._generation,
+            }
+
+    def collect_metrics(self) -> list[MetricFamily]:
+        stats = self.stats()
+        families = [
+            MetricFamily(
+                f"result_cache_{name}_total",
+                "counter",
+                f"Result cache {name}.",
+                [(f"result_cache_{name}_total", {}, float(stats[name]))],
+            )
+            for name in asdict(self._stats)
+        ]
+        families.extend(
+            MetricFamily(
+                f"result_cache_{name}",
+                "gauge",
+                f"Result cache {name}.",
+                [(f"result_cache_{name}", {}, float(stats[name]))],
+            )
+            for name in ("entries", "bytes")
+        )
+        return families
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+class GenerationTracker:
+    def __init__(
+        self,
+        loader: Callable[[], str],
+        max_age_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        signature: Callable[[], Hashable | None] | None = None,
+    ) -> None:
+        self._loader = loader
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._signature = signature
+        self._value: str | None = None
+        self._loaded_at = 0.0
+        self._seen: Hashable | None = None
+
+    def cached(self) -> str | None:
+        if self._value is None:
+            return None
+        if self._clock() - self._loaded_at < self.max_age_seconds:
+            return self._value
+        # An unchanged signature means nothing was committed since the last load.
+        # None means it cannot tell, so the value is reloaded.
+        if self._signature is not None:
+            current = self._signature()
+            if current is not None and current == self._seen:
+                return self._value
+        return None
+
+    def refresh(self) -> str:
+        # Taken before loading: a commit in between shows up as a changed signature later.
+        seen = self._signature() if self._signature is not None else None
+        value = self._loader()
+        self._value, self._loaded_at, self._seen = value, self._clock(), seen
+        return value
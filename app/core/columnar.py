@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import pandas as pd
+from fastapi import Response
+
+from app.core.errors import AppError, ErrorCode
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+COLUMNAR_MEDIA_TYPES = {
+    "arrow": ARROW_STREAM_MEDIA_TYPE,
+    "parquet": PARQUET_MEDIA_TYPE,
+}
+
+
+def encode_frame(frame: pd.DataFrame, fmt: str) -> bytes:
+    if pa is None:
+        raise AppError(
+            code=ErrorCode.UNSUPPORTED_TYPE,
+            message=f"{fmt} output requires pyarrow; install the 'arrow' extra.",
+            status_code=406,
+        )
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink, compression="zstd")
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def columnar_response(content: bytes, fmt: str, etag: str | None = None) -> Response:
+    headers = {"ETag": etag} if etag else None
+    return Response(content=content, media_type=COLUMNAR_MEDIA_TYPES[fmt], headers=headers)
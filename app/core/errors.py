@@ -24,6 +24,9 @@ class AppError(Exception):
     status_code: int = 400
     details: dict[str, Any] | None = None
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (self.__class__, (self.code, self.message, self.status_code, self.details))
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "error_type": self.code.name.lower(),
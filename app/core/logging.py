@@ -9,6 +9,8 @@ from contextvars import ContextVar
 
 from fastapi import Request, Response
 
+from app.core.metrics import observe_request
+
 trace_id_var: ContextVar[str] = ContextVar("trace_id", default="-")
 
 
@@ -46,12 +48,25 @@ def set_trace_id(trace_id: str) -> None:
     trace_id_var.set(trace_id)
 
 
+def _route_label(request: Request) -> str:
+    # Label by route template, not raw path, so job ids and the like don't explode cardinality.
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
 async def trace_id_middleware(request: Request, call_next: Callable) -> Response:
     trace_id = request.headers.get("X-Trace-Id") or generate_trace_id()
     set_trace_id(trace_id)
     start = time.perf_counter()
-    response = await call_next(request)
-    duration_ms = int((time.perf_counter() - start) * 1000)
+    try:
+        response = await call_next(request)
+    except Exception:
+        observe_request(request.method, _route_label(request), 500, time.perf_counter() - start)
+        raise
+    elapsed = time.perf_counter() - start
+    # Streaming bodies are timed to the first byte; the rest is sent after this returns.
+    observe_request(request.method, _route_label(request), response.status_code, elapsed)
+    duration_ms = int(elapsed * 1000)
     response.headers["X-Trace-Id"] = trace_id
     response.headers["X-Process-Time-Ms"] = str(duration_ms)
     return response
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+StageTiming = tuple[str, str, float]
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    kind: str
+    description: str
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def collect(self) -> MetricFamily: ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, description, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            values = dict(self._values)
+        family = MetricFamily(self.name, self.kind, self.description)
+        for key, value in sorted(values.items()):
+            family.samples.append((self.name, dict(zip(self.labelnames, key, strict=True)), value))
+        return family
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # Per series: one slot per bucket plus +Inf, then sum and count.
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels: Any) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        def decorator(func: Callable[..., T]) -> Callable[..., T]:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> T:
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        family = MetricFamily(self.name, self.kind, self.description)
+        for key, values in sorted(series.items()):
+            labels = dict(zip(self.labelnames, key, strict=True))
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, math.inf), values[:-2], strict=True):
+                cumulative += count
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                family.samples.append((f"{self.name}_bucket", bucket_labels, cumulative))
+            family.samples.append((f"{self.name}_sum", labels, values[-2]))
+            family.samples.append((f"{self.name}_count", labels, values[-1]))
+        return family
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], list[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, description, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], list[MetricFamily]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> list[MetricFamily]:
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {family.description}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            lines.extend(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+                for name, labels, value in family.samples
+            )
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Any) -> Any:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route and status.",
+    ("method", "route", "status"),
+)
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "db_query_duration_seconds", "SQLite read time by operation.", ("operation",)
+)
+FRAME_BUILD_LATENCY = REGISTRY.histogram(
+    "dataframe_build_duration_seconds", "DataFrame load/build time by operation.", ("operation",)
+)
+STAGE_LATENCY = REGISTRY.histogram(
+    "stage_duration_seconds",
+    "Ingest, calc and export stage time.",
+    ("pipeline", "stage"),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+JOB_LATENCY = REGISTRY.histogram(
+    "job_duration_seconds",
+    "Background job run time by kind and status.",
+    ("kind", "status"),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+_stage_collector: list[StageTiming] | None = None
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    HTTP_REQUESTS.inc(method=method, route=route, status=status)
+    HTTP_LATENCY.observe(seconds, method=method, route=route, status=status)
+
+
+def record_stage(pipeline: str, stage: str, seconds: float) -> None:
+    STAGE_LATENCY.observe(seconds, pipeline=pipeline, stage=stage)
+    if _stage_collector is not None:
+        _stage_collector.append((pipeline, stage, seconds))
+
+
+@contextmanager
+def time_stage(pipeline: str, stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(pipeline, stage, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_stage_timings() -> Iterator[list[StageTiming]]:
+    # Worker processes have their own registry, so timings are collected and shipped back.
+    global _stage_collector
+    previous, timings = _stage_collector, []
+    _stage_collector = timings
+    try:
+        yield timings
+    finally:
+        _stage_collector = previous
+
+
+def record_stage_timings(timings: list[StageTiming]) -> None:
+    for pipeline, stage, seconds in timings:
+        record_stage(pipeline, stage, seconds)
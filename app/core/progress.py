@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+ProgressSink = Callable[[str, float], None]
+
+_sink: ProgressSink | None = None
+
+
+def set_progress_sink(sink: ProgressSink | None) -> None:
+    global _sink
+    _sink = sink
+
+
+def report_progress(stage: str, fraction: float) -> None:
+    # No-op unless a job worker installed a sink, so CLI runs are unaffected.
+    if _sink is not None:
+        _sink(stage, min(max(fraction, 0.0), 1.0))
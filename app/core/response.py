@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from collections.abc import Iterable, Iterator
 from typing import Any
 
-from fastapi.responses import JSONResponse
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
 
+from app.core.columnar import COLUMNAR_MEDIA_TYPES
 from app.core.errors import AppError, ErrorCode
-from app.core.logging import get_trace_id
+from app.core.logging import get_logger, get_trace_id
+from app.core.serialization import FastJSONResponse, dumps
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+logger = get_logger(__name__)
 
 
 def build_response_data(data: dict[str, Any], trace_id: str) -> dict[str, Any]:
@@ -26,12 +36,93 @@ def build_error_data(error: AppError, trace_id: str) -> dict[str, Any]:
     }
 
 
-def success_response(data: dict[str, Any]) -> JSONResponse:
-    return JSONResponse(status_code=200, content=build_response_data(data, get_trace_id()))
+def compute_etag(data_version: str, kind: str, params: dict[str, Any]) -> str:
+    # data_version is "<epoch>:<generation>": a bare generation repeats after ingest --reset,
+    # and an ETag never expires, so it would validate stale copies indefinitely.
+    payload = json.dumps([data_version, kind, params], ensure_ascii=False, sort_keys=True, default=str)
+    return f'"{hashlib.sha1(payload.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in [value.removeprefix("W/") for value in candidates]
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def success_response(data: dict[str, Any], etag: str | None = None) -> FastJSONResponse:
+    headers = {"ETag": etag} if etag else None
+    return FastJSONResponse(
+        status_code=200,
+        content=build_response_data(data, get_trace_id()),
+        headers=headers,
+    )
 
 
-def error_response(error: AppError) -> JSONResponse:
-    return JSONResponse(
+def error_response(error: AppError) -> FastJSONResponse:
+    return FastJSONResponse(
         status_code=error.status_code,
         content=build_error_data(error, get_trace_id()),
     )
+
+
+def negotiate_format(
+    request: Request,
+    fmt: str | None = None,
+    stream: bool = False,
+    supported: Iterable[str] = ("json",),
+) -> str:
+    supported = ["json", *supported]
+    if fmt:
+        if fmt not in supported:
+            raise AppError(
+                code=ErrorCode.UNSUPPORTED_TYPE,
+                message=f"Unsupported response format: {fmt}.",
+                status_code=406,
+                details={"supported": supported},
+            )
+        return fmt
+    if stream and "ndjson" in supported:
+        return "ndjson"
+    accept = request.headers.get("Accept", "")
+    media_types = {"ndjson": NDJSON_MEDIA_TYPE, **COLUMNAR_MEDIA_TYPES}
+    return next(
+        (name for name, media in media_types.items() if name in supported and media in accept),
+        "json",
+    )
+
+
+def _ndjson_lines(batches: Iterable[list[dict[str, Any]]], trace_id: str) -> Iterator[bytes]:
+    count = 0
+    try:
+        for batch in batches:
+            count += len(batch)
+            if batch:
+                yield b"".join(dumps(row) + b"\n" for row in batch)
+    except AppError as exc:
+        yield dumps(build_error_data(exc, trace_id)) + b"\n"
+        return
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Streaming response failed", extra={"error": str(exc)})
+        error = AppError(
+            code=ErrorCode.INTERNAL_ERROR,
+            message="Internal server error.",
+            status_code=500,
+        )
+        yield dumps(build_error_data(error, trace_id)) + b"\n"
+        return
+    summary = build_response_data({"count": count}, trace_id)
+    yield dumps(summary) + b"\n"
+
+
+def ndjson_response(
+    batches: Iterable[list[dict[str, Any]]], etag: str | None = None
+) -> StreamingResponse:
+    headers = {"ETag": etag} if etag else None
+    return StreamingResponse(
+        _ndjson_lines(batches, get_trace_id()), media_type=NDJSON_MEDIA_TYPE, headers=headers
+    )
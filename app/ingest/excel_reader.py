@@ -3,6 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 
 import pandas as pd
+from openpyxl import load_workbook
 
 from app.core.errors import AppError, ErrorCode
 
@@ -13,6 +14,37 @@ REQUIRED_SHEETS = {
 }
 
 
+def resolve_sheet_names(sheet_names: list[str]) -> dict[str, str]:
+    resolved: dict[str, str] = {}
+    for statement_type, aliases in REQUIRED_SHEETS.items():
+        sheet_name = next((name for name in aliases if name in sheet_names), None)
+        if not sheet_name:
+            raise AppError(
+                code=ErrorCode.VALIDATION_ERROR,
+                message=f"Missing required sheet for {statement_type}.",
+                status_code=400,
+            )
+        resolved[statement_type] = sheet_name
+    return resolved
+
+
+def validate_company_workbook(file_path: Path) -> dict[str, str]:
+    # Only reads the workbook index, so uploads are checked without parsing any sheet.
+    try:
+        workbook = load_workbook(file_path, read_only=True)
+    except Exception as exc:
+        raise AppError(
+            code=ErrorCode.PARSE_ERROR,
+            message="Failed to read Excel file.",
+            status_code=400,
+            details={"error": str(exc)},
+        ) from exc
+    try:
+        return resolve_sheet_names(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
 def read_company_excel(file_path: Path) -> dict[str, pd.DataFrame]:
     if not file_path.exists():
         raise AppError(
@@ -31,16 +63,49 @@ def read_company_excel(file_path: Path) -> dict[str, pd.DataFrame]:
             details={"error": str(exc)},
         ) from exc
 
-    sheet_map: dict[str, pd.DataFrame] = {}
+    return {
+        statement_type: excel.parse(sheet_name)
+        for statement_type, sheet_name in resolve_sheet_names(excel.sheet_names).items()
+    }
 
-    for statement_type, aliases in REQUIRED_SHEETS.items():
-        sheet_name = next((name for name in aliases if name in excel.sheet_names), None)
-        if not sheet_name:
-            raise AppError(
-                code=ErrorCode.VALIDATION_ERROR,
-                message=f"Missing required sheet for {statement_type}.",
-                status_code=400,
-            )
-        sheet_map[statement_type] = excel.parse(sheet_name)
 
-    return sheet_map
+PROFILE_COLUMNS = {
+    "company_name": ["company_name", "公司名称", "公司"],
+    "industry": ["industry", "行业"],
+    "size_bucket": ["size_bucket", "规模"],
+}
+
+
+def read_company_profiles(file_path: Path) -> pd.DataFrame:
+    if not file_path.exists():
+        raise AppError(
+            code=ErrorCode.INVALID_REQUEST,
+            message=f"Profiles file not found: {file_path}",
+            status_code=404,
+        )
+
+    try:
+        raw = pd.read_csv(file_path, dtype=str)
+    except Exception as exc:
+        raise AppError(
+            code=ErrorCode.PARSE_ERROR,
+            message="Failed to read profiles file.",
+            status_code=400,
+            details={"error": str(exc)},
+        ) from exc
+
+    columns = [str(col).strip() for col in raw.columns]
+    raw.columns = columns
+    profiles = pd.DataFrame(index=raw.index)
+    for field, aliases in PROFILE_COLUMNS.items():
+        column = next((name for name in aliases if name in columns), None)
+        profiles[field] = raw[column].str.strip() if column else None
+
+    if profiles["company_name"].isna().all():
+        raise AppError(
+            code=ErrorCode.VALIDATION_ERROR,
+            message="Profiles file requires a company_name column.",
+            status_code=400,
+            details={"columns": columns},
+        )
+    return profiles.dropna(subset=["company_name"])
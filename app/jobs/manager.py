@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import functools
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from collections.abc import Collection
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.core.errors import AppError, ErrorCode
+from app.core.metrics import (
+    JOB_LATENCY,
+    MetricFamily,
+    collect_stage_timings,
+    record_stage_timings,
+)
+from app.core.progress import set_progress_sink
+from app.jobs.tasks import WRITER_JOB_KINDS, is_exclusive_job, run_task, set_write_lock
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+_events: Any = None
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    params: dict[str, Any]
+    db_path: str
+    job_dir: Path
+    status: str = JOB_QUEUED
+    stage: str | None = None
+    progress: float = 0.0
+    result: dict[str, Any] | None = None
+    error: dict[str, Any] | None = None
+    artifact: Path | None = None
+    stages: dict[str, float] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self) -> dict[str, Any]:
+        now = time.time()
+        started = self.started_at or now
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 4),
+            "params": self.params,
+            "result": self.result,
+            "error": self.error,
+            "artifact": self.artifact.name if self.artifact else None,
+            "stages": dict(self.stages),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": round(started - self.created_at, 3),
+            "run_seconds": (
+                round((self.finished_at or now) - self.started_at, 3)
+                if self.started_at is not None
+                else None
+            ),
+        }
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def job_directory(output_dir: str, job_id: str) -> Path:
+    return Path(output_dir) / "jobs" / job_id
+
+
+def _init_worker(events: Any, write_lock: Any) -> None:
+    global _events
+    _events = events
+    set_write_lock(write_lock)
+
+
+def _execute(
+    job_id: str, kind: str, db_path: str, job_dir: str, params: dict[str, Any]
+) -> dict[str, Any]:
+    def sink(stage: str, fraction: float) -> None:
+        _events.put(("progress", job_id, (stage, fraction)))
+
+    set_progress_sink(sink)
+    with collect_stage_timings() as timings:
+        try:
+            return run_task(kind, db_path, Path(job_dir), params)
+        finally:
+            set_progress_sink(None)
+            # Stage timings are observed in this worker's registry; ship them to the API process.
+            _events.put(("stages", job_id, timings))
+
+
+def _job_error(exc: BaseException) -> dict[str, Any]:
+    if not isinstance(exc, AppError):
+        exc = AppError(
+            code=ErrorCode.INTERNAL_ERROR,
+            message="Job failed.",
+            status_code=500,
+            details={"error": str(exc)},
+        )
+    return {"code": int(exc.code), "message": exc.message, "data": exc.to_dict()}
+
+
+class JobManager:
+    def __init__(
+        self,
+        max_workers: int = 2,
+        kind_limits: dict[str, int] | None = None,
+        history_limit: int = 200,
+        writer_kinds: Collection[str] = WRITER_JOB_KINDS,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.kind_limits = kind_limits or {}
+        self.history_limit = history_limit
+        self.writer_kinds = frozenset(writer_kinds)
+        self._lock = threading.RLock()
+        self._jobs: dict[str, Job] = {}
+        self._pending: deque[str] = deque()
+        self._running: Counter[str] = Counter()
+        self._exclusive: str | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._events: Any = None
+        self._listener: threading.Thread | None = None
+
+    def submit(
+        self,
+        kind: str,
+        params: dict[str, Any],
+        db_path: str,
+        output_dir: str,
+        job_id: str | None = None,
+    ) -> Job:
+        job_id = job_id or new_job_id()
+        job = Job(
+            job_id=job_id,
+            kind=kind,
+            params=params,
+            db_path=db_path,
+            job_dir=job_directory(output_dir, job_id),
+        )
+        with self._lock:
+            if is_exclusive_job(kind, params):
+                active = len(self._pending) + sum(self._running.values())
+                if active:
+                    raise AppError(
+                        code=ErrorCode.INVALID_REQUEST,
+                        message="Reset is not allowed while other jobs are queued or running.",
+                        status_code=409,
+                        details={"active_jobs": active},
+                    )
+                self._exclusive = job_id
+            self._jobs[job_id] = job
+            self._pending.append(job_id)
+            self._dispatch()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise AppError(
+                code=ErrorCode.INVALID_REQUEST,
+                message=f"Job not found: {job_id}.",
+                status_code=404,
+            )
+        return job
+
+    def collect_metrics(self) -> list[MetricFamily]:
+        with self._lock:
+            statuses = Counter(job.status for job in self._jobs.values())
+        family = MetricFamily("jobs", "gauge", "Background jobs held in memory by status.")
+        for status in (JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED):
+            family.samples.append(("jobs", {"status": status}, float(statuses[status])))
+        return [family]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            listener = self._listener
+            self._drop_executor()
+        if listener is not None:
+            listener.join(timeout=1)
+
+    def _drop_executor(self) -> None:
+        # Called with the lock held; the next _ensure_executor builds a fresh pool.
+        executor, events = self._executor, self._events
+        self._executor = self._events = self._listener = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if events is not None:
+            events.put(None)
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Not fork: the API process has DB-executor threads that may hold locks (sqlite,
+            # logging) at fork time, and jobs start their own nested pools.
+            context = multiprocessing.get_context("spawn")
+            self._events = context.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                # A fresh lock per pool: one held by a worker that died goes away with it.
+                initargs=(self._events, context.Lock()),
+            )
+            self._listener = threading.Thread(
+                target=self._listen, args=(self._events,), name="job-events", daemon=True
+            )
+            self._listener.start()
+        return self._executor
+
+    def _dispatch(self) -> None:
+        # Called with the lock held; starts queued jobs in FIFO order within the limits.
+        # Writers share one slot so SQLite never sees two of them, and an exclusive job
+        # (ingest reset) holds back everything submitted after it until it finishes.
+        for job_id in list(self._pending):
+            if sum(self._running.values()) >= self.max_workers:
+                break
+            if self._exclusive is not None and self._exclusive != job_id:
+                break
+            job = self._jobs[job_id]
+            if self._running[job.kind] >= self.kind_limits.get(job.kind, self.max_workers):
+                continue
+            if job.kind in self.writer_kinds and self._writers_running():
+                continue
+            self._pending.remove(job_id)
+            self._running[job.kind] += 1
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            executor = self._ensure_executor()
+            try:
+                future = executor.submit(
+                    _execute, job.job_id, job.kind, job.db_path, str(job.job_dir), job.params
+                )
+            except Exception as exc:
+                # Raising here would be swallowed by the done-callback that called us and
+                # leave the job "running" forever; fail it and free its slot instead.
+                if isinstance(exc, BrokenProcessPool) and self._executor is executor:
+                    self._drop_executor()
+                self._running[job.kind] -= 1
+                if self._exclusive == job_id:
+                    self._exclusive = None
+                job.status = JOB_FAILED
+                job.finished_at = time.time()
+                job.error = _job_error(exc)
+                continue
+            future.add_done_callback(functools.partial(self._finish, job.job_id, executor))
+
+    def _writers_running(self) -> int:
+        return sum(self._running[kind] for kind in self.writer_kinds)
+
+    def _finish(self, job_id: str, executor: ProcessPoolExecutor, future: Future) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            self._running[job.kind] -= 1
+            if self._exclusive == job_id:
+                self._exclusive = None
+            job.finished_at = time.time()
+            exc = future.exception() if not future.cancelled() else None
+            # A worker that died (os._exit, OOM kill) breaks the whole pool; every job on it
+            # fails once, then queued jobs go to a new pool instead of a dead one.
+            broken = isinstance(exc, BrokenProcessPool) and self._executor is executor
+            if broken:
+                self._drop_executor()
+            if future.cancelled() or exc is not None:
+                job.status = JOB_FAILED
+                job.error = _job_error(exc or RuntimeError("Job cancelled."))
+            else:
+                job.status = JOB_SUCCEEDED
+                job.progress = 1.0
+                job.result = future.result()
+                path = job.result.get("path")
+                job.artifact = Path(path) if path else None
+            JOB_LATENCY.observe(
+                job.finished_at - (job.started_at or job.finished_at),
+                kind=job.kind,
+                status=job.status,
+            )
+            self._prune()
+            if broken or self._executor is not None:
+                self._dispatch()
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
+
+    def _listen(self, events: Any) -> None:
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            kind, job_id, payload = event
+            if kind == "stages":
+                record_stage_timings(payload)
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                if kind == "stages":
+                    for pipeline, stage, seconds in payload:
+                        name = f"{pipeline}.{stage}"
+                        job.stages[name] = round(job.stages.get(name, 0.0) + seconds, 6)
+                elif job.status == JOB_RUNNING:
+                    job.stage, job.progress = payload
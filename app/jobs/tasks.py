@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import shutil
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel, ValidationError
+
+from app.config import get_settings
+from app.core.errors import AppError, ErrorCode
+from app.reporting.template_generator import DEFAULT_TEMPLATE_PATH
+from app.services import (
+    calc_command,
+    export_excel_command,
+    export_html_command,
+    export_ppt_command,
+    ingest_command,
+)
+
+UPLOAD_JOB_KIND = "ingest_upload"
+UPLOAD_DIRNAME = "upload"
+# Jobs that write to SQLite; the job manager runs at most one of them at a time.
+# Upload ingests are not among them: they parse in parallel (JOB_KIND_LIMITS) and
+# only take the write lock around their insert.
+WRITER_JOB_KINDS = frozenset({"ingest", "calc"})
+
+# Shared by every worker of a job pool; set by the job manager's worker initializer.
+_write_lock: AbstractContextManager[Any] | None = None
+
+
+def set_write_lock(lock: AbstractContextManager[Any] | None) -> None:
+    global _write_lock
+    _write_lock = lock
+
+
+def write_lock() -> AbstractContextManager[Any]:
+    return _write_lock if _write_lock is not None else nullcontext()
+
+
+class JobSubmission(BaseModel):
+    params: dict[str, Any] = {}
+
+
+class IngestJobParams(BaseModel):
+    reset: bool = False
+
+
+class UploadJobParams(BaseModel):
+    pass
+
+
+class CalcJobParams(BaseModel):
+    missing_strategy: Literal["warn", "error"] | None = None
+    workers: int = 1
+
+
+class ExportExcelJobParams(BaseModel):
+    indicator: str = "net_profit_margin"
+    year: int
+    n: int = 5
+    company: str | None = None
+    statement_type: str | None = None
+    subject_prefix: str | None = None
+    workers: int = 1
+    bundle: bool = False
+    companies: list[str] | None = None
+    years: list[int] | None = None
+    indicators: list[str] | None = None
+
+
+class ExportPptJobParams(BaseModel):
+    indicator: str = "net_profit_margin"
+    year: int
+    n: int = 5
+    workers: int = 1
+    bundle: bool = False
+    companies: list[str] | None = None
+    years: list[int] | None = None
+    indicators: list[str] | None = None
+
+
+class ExportHtmlJobParams(BaseModel):
+    indicator: str = "net_profit_margin"
+    year: int
+    n: int = 5
+    companies: list[str] | None = None
+    years: list[int] | None = None
+    indicators: list[str] | None = None
+
+
+def _ingest(
+    db_path: str, job_dir: Path, reset: bool = False, input_dir: str | None = None
+) -> dict[str, Any]:
+    return ingest_command(input_dir or get_settings().input_dir, db_path, reset)
+
+
+def _ingest_upload(db_path: str, job_dir: Path) -> dict[str, Any]:
+    upload_dir = job_dir / UPLOAD_DIRNAME
+    try:
+        return ingest_command(str(upload_dir), db_path, reset=False, write_lock=write_lock())
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+def _calc(
+    db_path: str, job_dir: Path, missing_strategy: str | None = None, workers: int = 1
+) -> dict[str, Any]:
+    strategy = missing_strategy or get_settings().missing_value_strategy
+    return calc_command(db_path, strategy, workers=workers)
+
+
+def _bundle_params(job_dir: Path, bundle: bool) -> dict[str, Any]:
+    # Bundles are zipped so the job still has a single downloadable artifact.
+    return {"bundle_dir": str(job_dir / "bundle"), "zip_bundle": True} if bundle else {}
+
+
+def _export_excel(
+    db_path: str, job_dir: Path, bundle: bool = False, **params: Any
+) -> dict[str, Any]:
+    return export_excel_command(
+        db_path, str(job_dir / "report.xlsx"), **params, **_bundle_params(job_dir, bundle)
+    )
+
+
+def _export_ppt(db_path: str, job_dir: Path, bundle: bool = False, **params: Any) -> dict[str, Any]:
+    return export_ppt_command(
+        db_path,
+        str(job_dir / "report.pptx"),
+        str(job_dir / "assets"),
+        str(DEFAULT_TEMPLATE_PATH),
+        **params,
+        **_bundle_params(job_dir, bundle),
+    )
+
+
+def _export_html(db_path: str, job_dir: Path, **params: Any) -> dict[str, Any]:
+    return export_html_command(db_path, str(job_dir / "report.html"), **params)
+
+
+JOB_TASKS: dict[str, tuple[type[BaseModel], Callable[..., dict[str, Any]]]] = {
+    "ingest": (IngestJobParams, _ingest),
+    UPLOAD_JOB_KIND: (UploadJobParams, _ingest_upload),
+    "calc": (CalcJobParams, _calc),
+    "export_excel": (ExportExcelJobParams, _export_excel),
+    "export_ppt": (ExportPptJobParams, _export_ppt),
+    "export_html": (ExportHtmlJobParams, _export_html),
+}
+
+
+def validate_job_params(kind: str, params: dict[str, Any]) -> dict[str, Any]:
+    # Upload ingests are only created by /ingest/upload, which spools the files first.
+    supported = sorted(set(JOB_TASKS) - {UPLOAD_JOB_KIND})
+    if kind not in supported:
+        raise AppError(
+            code=ErrorCode.UNSUPPORTED_TYPE,
+            message=f"Unsupported job type: {kind}.",
+            status_code=404,
+            details={"supported": supported},
+        )
+    model, _ = JOB_TASKS[kind]
+    try:
+        return model.model_validate(params).model_dump()
+    except ValidationError as exc:
+        raise AppError(
+            code=ErrorCode.INVALID_REQUEST,
+            message="Invalid job parameters.",
+            status_code=422,
+            details={"errors": exc.errors(include_url=False)},
+        ) from exc
+
+
+def is_exclusive_job(kind: str, params: dict[str, Any]) -> bool:
+    # A reset replaces every table, so it must not overlap any other job.
+    return kind == "ingest" and bool(params.get("reset"))
+
+
+def run_task(kind: str, db_path: str, job_dir: Path, params: dict[str, Any]) -> dict[str, Any]:
+    _, task = JOB_TASKS[kind]
+    job_dir.mkdir(parents=True, exist_ok=True)
+    if kind in WRITER_JOB_KINDS:
+        # Writer jobs hold the lock for their whole run so upload inserts wait for them.
+        with write_lock():
+            return task(db_path, job_dir, **params)
+    return task(db_path, job_dir, **params)
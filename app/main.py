@@ -7,17 +7,23 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
-from app.api.routes import router
+from app.api.routes import job_manager, router
 from app.config import get_settings
 from app.core.errors import AppError, ErrorCode
 from app.core.logging import configure_logging, get_logger, trace_id_middleware
 from app.core.response import error_response
+from app.core.serialization import FastJSONResponse
+from app.storage.async_repository import shutdown_db_executor
 
 settings = get_settings()
 configure_logging(settings.log_level)
 logger = get_logger(__name__)
 
-app = FastAPI(title=settings.app_name, version=settings.app_version)
+app = FastAPI(
+    title=settings.app_name,
+    version=settings.app_version,
+    default_response_class=FastJSONResponse,
+)
 
 app.middleware("http")(trace_id_middleware)
 app.include_router(router)
@@ -29,6 +35,12 @@ async def startup_event() -> None:
     logger.info("Service started", extra={"env": settings.app_env})
 
 
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    shutdown_db_executor()
+    job_manager.shutdown()
+
+
 @app.exception_handler(AppError)
 async def handle_app_error(_: Request, exc: AppError) -> JSONResponse:
     return error_response(exc)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from app.core.progress import report_progress
+from app.reporting.charts import ChartCache
+from app.reporting.excel_report import export_excel_report
+from app.reporting.ppt_report import export_ppt_report
+from app.storage.repository import (
+    fetch_companies,
+    fetch_facts_frame,
+    fetch_metrics_df,
+    fetch_overall_df,
+)
+
+BUNDLE_SUFFIXES = {"excel": ".xlsx", "ppt": ".pptx"}
+
+
+@dataclass
+class BundleOptions:
+    kind: str
+    year: int
+    ranking: pd.DataFrame
+    statement_type: str | None = None
+    subject_prefix: str | None = None
+    years: list[int] | None = None
+    indicators: list[str] | None = None
+    margins: pd.DataFrame | None = None
+    template_path: Path | None = None
+    assets_dir: Path | None = None
+    chart_cache_max_bytes: int = 0
+
+
+_options: BundleOptions | None = None
+
+
+def _init_bundle_worker(options: BundleOptions) -> None:
+    # Shared inputs (ranking, margins) reach each worker once instead of once per company.
+    global _options
+    _options = options
+
+
+def _export_company(db_path: str, company: str, output_dir: str) -> str | None:
+    options = _options
+    metrics_df = fetch_metrics_df(db_path, [company], options.years, options.indicators)
+    if metrics_df.empty:
+        return None
+    output_path = Path(output_dir) / f"{company}{BUNDLE_SUFFIXES[options.kind]}"
+    if options.kind == "excel":
+        drilldown_df = None
+        if options.statement_type and options.subject_prefix:
+            drilldown_df = fetch_facts_frame(
+                db_path, company, options.year, options.statement_type, options.subject_prefix
+            )
+        return str(export_excel_report(metrics_df, options.ranking, drilldown_df, output_path))
+
+    cache = None
+    if options.chart_cache_max_bytes > 0:
+        cache = ChartCache(options.assets_dir / "cache", options.chart_cache_max_bytes)
+    path = export_ppt_report(
+        metrics_df,
+        fetch_overall_df(db_path, [company], options.years),
+        output_path,
+        options.assets_dir / company,
+        options.template_path,
+        options.ranking,
+        chart_cache=cache,
+        margins_df=options.margins,
+    )
+    return str(path)
+
+
+def _run(
+    db_path: str, companies: list[str], output_dir: Path, options: BundleOptions, workers: int
+) -> Iterator[str | None]:
+    if workers <= 1 or len(companies) <= 1:
+        _init_bundle_worker(options)
+        for company in companies:
+            yield _export_company(db_path, company, str(output_dir))
+        return
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(companies)),
+        initializer=_init_bundle_worker,
+        initargs=(options,),
+    ) as executor:
+        futures = [
+            executor.submit(_export_company, db_path, company, str(output_dir))
+            for company in companies
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def zip_bundle(files: list[Path], zip_path: Path) -> Path:
+    # PPTX/XLSX are already deflated, so the archive only stores them.
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for path in files:
+            archive.write(path, arcname=path.name)
+    return zip_path
+
+
+def export_bundle(
+    db_path: str,
+    output_dir: Path,
+    options: BundleOptions,
+    workers: int = 1,
+    companies: list[str] | None = None,
+    zip_output: bool = False,
+) -> dict[str, Any]:
+    companies = companies if companies is not None else fetch_companies(db_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    files: list[Path] = []
+    for done, path in enumerate(_run(db_path, companies, output_dir, options, workers), start=1):
+        if path is not None:
+            files.append(Path(path))
+        report_progress("render", 0.3 + 0.6 * done / len(companies))
+    files.sort()
+    result: dict[str, Any] = {"path": str(output_dir), "files": len(files)}
+    if zip_output:
+        result["path"] = str(zip_bundle(files, output_dir.with_suffix(".zip")))
+    return result
@@ -1,9 +1,61 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
-import matplotlib.pyplot as plt
 import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+CHART_SIZE = (6, 3)
+CHART_DPI = 150
+# Raster via Agg or vector SVG, picked from the output suffix. python-pptx can only embed rasters.
+CHART_FORMATS = {".png": "png", ".svg": "svg"}
+# Bump when plot code changes the rendered output, so cached images are not reused.
+CHART_STYLE_VERSION = 2
+CHART_DATA_COLUMNS = ["company_name", "year", "indicator_name", "indicator_value", "risk_score"]
+
+
+@dataclass
+class ChartSpec:
+    kind: str
+    data: pd.DataFrame
+    output_path: Path
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+_figures = threading.local()
+
+
+def _figure() -> Figure:
+    # No pyplot state: each thread reuses its own Agg-backed figure, cleared between charts.
+    fig = getattr(_figures, "figure", None)
+    if fig is None:
+        fig = Figure(figsize=CHART_SIZE)
+        FigureCanvasAgg(fig)
+        _figures.figure = fig
+    fig.clear()
+    fig.set_size_inches(*CHART_SIZE)
+    return fig
+
+
+def _save(fig: Figure, output_path: Path) -> Path:
+    fmt = CHART_FORMATS.get(output_path.suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported chart format: {output_path.suffix}")
+    fig.tight_layout()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(output_path, dpi=CHART_DPI, format=fmt)
+    fig.clear()
+    return output_path
 
 
 def plot_trend(
@@ -13,19 +65,16 @@ def plot_trend(
     output_path: Path,
 ) -> Path:
     company_df = metrics_df[metrics_df["company_name"] == company]
-    plt.figure(figsize=(6, 3))
+    fig = _figure()
+    ax = fig.add_subplot()
     for indicator in indicator_names:
         subset = company_df[company_df["indicator_name"] == indicator]
-        plt.plot(subset["year"], subset["indicator_value"], marker="o", label=indicator)
-    plt.title(f"{company} 关键指标趋势")
-    plt.xlabel("年份")
-    plt.ylabel("指标值")
-    plt.legend()
-    plt.tight_layout()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_path, dpi=150)
-    plt.close()
-    return output_path
+        ax.plot(subset["year"], subset["indicator_value"], marker="o", label=indicator)
+    ax.set_title(f"{company} 关键指标趋势")
+    ax.set_xlabel("年份")
+    ax.set_ylabel("指标值")
+    ax.legend()
+    return _save(fig, output_path)
 
 
 def plot_bar(
@@ -38,31 +87,139 @@ def plot_bar(
         (metrics_df["indicator_name"] == indicator) & (metrics_df["year"] == year)
     ]
     subset = subset.sort_values("indicator_value", ascending=False)
-    plt.figure(figsize=(6, 3))
-    plt.bar(subset["company_name"], subset["indicator_value"])
-    plt.title(f"{year} {indicator} 排名")
-    plt.xlabel("公司")
-    plt.ylabel("指标值")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_path, dpi=150)
-    plt.close()
-    return output_path
+    fig = _figure()
+    ax = fig.add_subplot()
+    ax.bar(subset["company_name"], subset["indicator_value"])
+    ax.set_title(f"{year} {indicator} 排名")
+    ax.set_xlabel("公司")
+    ax.set_ylabel("指标值")
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    return _save(fig, output_path)
 
 
 def plot_heatmap(metrics_df: pd.DataFrame, year: int, output_path: Path) -> Path:
     pivot = metrics_df[metrics_df["year"] == year].pivot(
         index="company_name", columns="indicator_name", values="risk_score"
     )
-    plt.figure(figsize=(6, 3))
-    plt.imshow(pivot, aspect="auto", cmap="Reds")
-    plt.colorbar(label="风险分数")
-    plt.yticks(range(len(pivot.index)), pivot.index)
-    plt.xticks(range(len(pivot.columns)), pivot.columns, rotation=45, ha="right")
-    plt.title(f"{year} 风险热力图")
-    plt.tight_layout()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(output_path, dpi=150)
-    plt.close()
-    return output_path
+    fig = _figure()
+    ax = fig.add_subplot()
+    image = ax.imshow(pivot, aspect="auto", cmap="Reds")
+    fig.colorbar(image, ax=ax, label="风险分数")
+    ax.set_yticks(range(len(pivot.index)), pivot.index)
+    ax.set_xticks(range(len(pivot.columns)), pivot.columns, rotation=45, ha="right")
+    ax.set_title(f"{year} 风险热力图")
+    return _save(fig, output_path)
+
+
+def render_chart(spec: ChartSpec) -> Path:
+    if spec.kind == "trend":
+        return plot_trend(
+            spec.data, spec.options["company"], spec.options["indicators"], spec.output_path
+        )
+    if spec.kind == "bar":
+        return plot_bar(spec.data, spec.options["indicator"], spec.options["year"], spec.output_path)
+    if spec.kind == "heatmap":
+        return plot_heatmap(spec.data, spec.options["year"], spec.output_path)
+    raise ValueError(f"Unknown chart kind: {spec.kind}")
+
+
+def chart_key(spec: ChartSpec) -> str:
+    digest = hashlib.sha1()
+    style = [
+        spec.kind,
+        spec.options,
+        spec.output_path.suffix.lower(),
+        CHART_SIZE,
+        CHART_DPI,
+        CHART_STYLE_VERSION,
+    ]
+    digest.update(json.dumps(style, sort_keys=True, default=str).encode("utf-8"))
+    columns = [column for column in CHART_DATA_COLUMNS if column in spec.data.columns]
+    data = spec.data[columns].reset_index(drop=True)
+    digest.update(",".join(columns).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ChartCache:
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key: str, suffix: str = ".png") -> Path:
+        return self.directory / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = ".png") -> Path | None:
+        path = self.path(key, suffix)
+        try:
+            # mtime doubles as the LRU clock.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, rendered: Path) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.path(key, rendered.suffix.lower())
+        # Write then rename, so concurrent exports never see a partial image.
+        partial = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        shutil.copyfile(rendered, partial)
+        os.replace(partial, target)
+        return target
+
+    def evict(self) -> int:
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix not in CHART_FORMATS:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+
+def _render_all(specs: Sequence[ChartSpec], workers: int) -> list[Path]:
+    if workers <= 1 or len(specs) <= 1:
+        return [render_chart(spec) for spec in specs]
+    workers = min(workers, len(specs))
+    # Small chunks keep workers balanced; each spec only carries its own data slice.
+    chunksize = max(1, len(specs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render_chart, specs, chunksize=chunksize))
+
+
+def render_charts(
+    specs: Sequence[ChartSpec], workers: int = 1, cache: ChartCache | None = None
+) -> list[Path]:
+    if cache is None:
+        return _render_all(specs, workers)
+
+    keys = [chart_key(spec) for spec in specs]
+    pending: dict[str, ChartSpec] = {}
+    for spec, key in zip(specs, keys, strict=True):
+        cached = cache.get(key, spec.output_path.suffix.lower())
+        if cached is not None:
+            spec.output_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(cached, spec.output_path)
+        elif key not in pending:
+            pending[key] = spec
+    for key, rendered in zip(pending, _render_all(list(pending.values()), workers), strict=True):
+        cache.put(key, rendered)
+    # Specs that shared a key with a freshly rendered chart still need their own copy.
+    for spec, key in zip(specs, keys, strict=True):
+        if not spec.output_path.exists() and key in pending:
+            shutil.copyfile(pending[key].output_path, spec.output_path)
+    cache.evict()
+    return [spec.output_path for spec in specs]
@@ -1,36 +1,100 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
+from openpyxl import Workbook
+from openpyxl.formatting.rule import CellIsRule
 from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 
 RISK_COLORS = {
     "low": "C6EFCE",
     "medium": "FFEB9C",
     "high": "FFC7CE",
 }
+# Excel allows 1,048,576 rows per sheet, one of which is the header.
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def _risk_rules(worksheet: WriteOnlyWorksheet, columns: list[str]) -> None:
+    if "risk_level" not in columns:
+        return
+    letter = get_column_letter(columns.index("risk_level") + 1)
+    cells = f"{letter}2:{letter}{EXCEL_MAX_ROWS + 1}"
+    for level, color in RISK_COLORS.items():
+        fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        worksheet.conditional_formatting.add(
+            cells, CellIsRule(operator="equal", formula=[f'"{level}"'], fill=fill)
+        )
+
+
+def _records(frame: pd.DataFrame) -> Iterator[tuple[Any, ...]]:
+    values = frame.astype(object).where(frame.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+class _SheetWriter:
+    # Appends frames to a write-only sheet, starting a numbered continuation sheet at max_rows.
+    def __init__(self, workbook: Workbook, title: str, max_rows: int) -> None:
+        self.workbook = workbook
+        self.title = title
+        self.max_rows = max_rows
+        self.columns: list[str] | None = None
+        self.sheets = 0
+        self._worksheet: WriteOnlyWorksheet | None = None
+        self._rows = 0
+
+    def _next_sheet(self) -> WriteOnlyWorksheet:
+        self.sheets += 1
+        title = self.title if self.sheets == 1 else f"{self.title}_{self.sheets}"
+        worksheet = self.workbook.create_sheet(title)
+        if self.columns is not None:
+            worksheet.append(self.columns)
+            _risk_rules(worksheet, self.columns)
+        self._worksheet, self._rows = worksheet, 0
+        return worksheet
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.columns is None:
+            self.columns = [str(column) for column in frame.columns]
+        worksheet = self._worksheet or self._next_sheet()
+        for record in _records(frame):
+            if self._rows >= self.max_rows:
+                worksheet = self._next_sheet()
+            worksheet.append(record)
+            self._rows += 1
+
+    def close(self) -> None:
+        if self._worksheet is None:
+            self._next_sheet()
 
 
 def export_excel_report(
-    metrics_df: pd.DataFrame,
+    metrics: pd.DataFrame | Iterable[pd.DataFrame],
     ranking_df: pd.DataFrame,
     drilldown_df: pd.DataFrame | None,
     output_path: Path,
+    max_rows: int = EXCEL_MAX_ROWS,
 ) -> Path:
+    # Write-only workbook: rows go straight to the zip stream, so memory does not grow with them.
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-        metrics_df.to_excel(writer, sheet_name="指标表", index=False)
-        ranking_df.to_excel(writer, sheet_name="排名表", index=False)
-        if drilldown_df is not None:
-            drilldown_df.to_excel(writer, sheet_name="明细下钻", index=False)
-
-        worksheet = writer.sheets["指标表"]
-        risk_col_idx = metrics_df.columns.get_loc("risk_level") + 1
-        for row_idx in range(2, len(metrics_df) + 2):
-            cell = worksheet.cell(row=row_idx, column=risk_col_idx)
-            color = RISK_COLORS.get(cell.value)
-            if color:
-                cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+    workbook = Workbook(write_only=True)
+    metrics_sheet = _SheetWriter(workbook, "指标表", max_rows)
+    for chunk in [metrics] if isinstance(metrics, pd.DataFrame) else metrics:
+        metrics_sheet.write(chunk)
+    metrics_sheet.close()
+
+    frames = [("排名表", ranking_df)]
+    if drilldown_df is not None:
+        frames.append(("明细下钻", drilldown_df))
+    for title, frame in frames:
+        sheet = _SheetWriter(workbook, title, max_rows)
+        sheet.write(frame)
+        sheet.close()
 
+    workbook.save(output_path)
     return output_path
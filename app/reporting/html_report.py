@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import html
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from app.core.serialization import dumps
+from app.reporting.ppt_report import TREND_INDICATORS
+
+HTML_METRIC_COLUMNS = [
+    "company_name",
+    "year",
+    "indicator_name",
+    "indicator_value",
+    "risk_level",
+    "risk_score",
+]
+HTML_OVERALL_COLUMNS = ["company_name", "year", "overall_risk_score"]
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font-family: -apple-system, "Segoe UI", "PingFang SC", "Microsoft YaHei", sans-serif;
+  margin: 24px; color: #222; }
+h1 { font-size: 22px; }
+h2 { font-size: 18px; margin-top: 32px; }
+table { border-collapse: collapse; font-size: 13px; }
+th, td { border: 1px solid #ddd; padding: 4px 8px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.low { background: #C6EFCE; }
+.medium { background: #FFEB9C; }
+.high { background: #FFC7CE; }
+.charts { display: flex; flex-wrap: wrap; gap: 16px; }
+.card { border: 1px solid #eee; padding: 8px; }
+svg text { font-size: 11px; fill: #444; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<h2>公司概览</h2>
+<div id="overview"></div>
+<h2>关键指标趋势</h2>
+<div id="trends" class="charts"></div>
+<h2 id="ranking-title">排名</h2>
+<div id="ranking"></div>
+<h2 id="heatmap-title">风险热力图</h2>
+<div id="heatmap"></div>
+<script type="application/json" id="report-data">__DATA__</script>
+<script>
+(function () {
+  var data = JSON.parse(document.getElementById("report-data").textContent);
+  var SVG_NS = "http://www.w3.org/2000/svg";
+  var COLORS = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f", "#b07aa1"];
+
+  function records(table) {
+    return table.rows.map(function (row) {
+      var record = {};
+      table.columns.forEach(function (column, i) { record[column] = row[i]; });
+      return record;
+    });
+  }
+  function el(tag, text, className) {
+    var node = document.createElement(tag);
+    if (text !== undefined) { node.textContent = text; }
+    if (className) { node.className = className; }
+    return node;
+  }
+  function shape(tag, attrs, text) {
+    var node = document.createElementNS(SVG_NS, tag);
+    Object.keys(attrs).forEach(function (key) { node.setAttribute(key, attrs[key]); });
+    if (text !== undefined) { node.textContent = text; }
+    return node;
+  }
+  function fmt(value) {
+    return value === null || value === undefined ? "N/A" : Number(value).toFixed(2);
+  }
+  function unique(values) {
+    return values.filter(function (value, i) { return values.indexOf(value) === i; });
+  }
+
+  var metrics = records(data.metrics);
+  var scores = {};
+  records(data.overall).forEach(function (row) {
+    scores[row.company_name + "|" + row.year] = row.overall_risk_score;
+  });
+  var companies = {};
+  metrics.forEach(function (row) {
+    (companies[row.company_name] = companies[row.company_name] || []).push(row);
+  });
+  var names = Object.keys(companies);
+  var indicators = unique(metrics.map(function (row) { return row.indicator_name; })).sort();
+
+  function overview() {
+    var table = el("table");
+    var header = el("tr");
+    ["公司", "年份", "总体风险分数"].concat(indicators).forEach(function (label) {
+      header.appendChild(el("th", label));
+    });
+    table.appendChild(header);
+    names.forEach(function (name) {
+      var rows = companies[name];
+      var latest = Math.max.apply(null, rows.map(function (row) { return row.year; }));
+      var values = {};
+      rows.forEach(function (row) { if (row.year === latest) { values[row.indicator_name] = row; } });
+      var tr = el("tr");
+      tr.appendChild(el("td", name));
+      tr.appendChild(el("td", String(latest)));
+      tr.appendChild(el("td", fmt(scores[name + "|" + latest])));
+      indicators.forEach(function (indicator) {
+        var row = values[indicator];
+        tr.appendChild(el("td", row ? fmt(row.indicator_value) : "", row ? row.risk_level : ""));
+      });
+      table.appendChild(tr);
+    });
+    document.getElementById("overview").appendChild(table);
+  }
+
+  function lineChart(title, series) {
+    var width = 360, height = 200, left = 44, right = 12, top = 24, bottom = 40;
+    var points = [].concat.apply([], series.map(function (s) { return s.points; }));
+    var xs = unique(points.map(function (p) { return p[0]; })).sort();
+    var ys = points.map(function (p) { return p[1]; });
+    var yMin = Math.min.apply(null, ys.concat([0])), yMax = Math.max.apply(null, ys.concat([0]));
+    if (yMax === yMin) { yMax = yMin + 1; }
+    function x(value) {
+      var i = xs.indexOf(value);
+      return left + (xs.length > 1 ? i / (xs.length - 1) : 0.5) * (width - left - right);
+    }
+    function y(value) { return top + (yMax - value) / (yMax - yMin) * (height - top - bottom); }
+    var chart = shape("svg", { width: width, height: height });
+    chart.appendChild(shape("text", { x: left, y: 14 }, title));
+    chart.appendChild(shape("line", {
+      x1: left, y1: y(0), x2: width - right, y2: y(0), stroke: "#bbb"
+    }));
+    [yMin, yMax].forEach(function (value) {
+      chart.appendChild(shape("text", { x: 2, y: y(value) + 4 }, fmt(value)));
+    });
+    xs.forEach(function (value) {
+      chart.appendChild(shape("text", {
+        x: x(value), y: height - bottom + 14, "text-anchor": "middle"
+      }, String(value)));
+    });
+    series.forEach(function (s, i) {
+      var color = COLORS[i % COLORS.length];
+      var path = s.points.map(function (p) { return x(p[0]) + "," + y(p[1]); }).join(" ");
+      chart.appendChild(shape("polyline", {
+        points: path, fill: "none", stroke: color, "stroke-width": 2
+      }));
+      s.points.forEach(function (p) {
+        chart.appendChild(shape("circle", { cx: x(p[0]), cy: y(p[1]), r: 3, fill: color }));
+      });
+      chart.appendChild(shape("text", {
+        x: left + i * 110, y: height - 6, fill: color
+      }, s.name));
+    });
+    return chart;
+  }
+
+  function trends() {
+    var container = document.getElementById("trends");
+    names.forEach(function (name) {
+      var series = data.trend_indicators.map(function (indicator) {
+        var points = companies[name]
+          .filter(function (row) {
+            return row.indicator_name === indicator && row.indicator_value !== null;
+          })
+          .map(function (row) { return [row.year, row.indicator_value]; })
+          .sort(function (a, b) { return a[0] - b[0]; });
+        return { name: indicator, points: points };
+      }).filter(function (s) { return s.points.length > 0; });
+      var card = el("div", undefined, "card");
+      card.appendChild(lineChart(name + " 关键指标趋势", series));
+      container.appendChild(card);
+    });
+  }
+
+  function ranking() {
+    var rows = records(data.ranking);
+    document.getElementById("ranking-title").textContent =
+      data.year + " " + data.indicator + " 排名";
+    var width = 520, labelWidth = 140, barHeight = 22;
+    var values = rows.map(function (row) { return Math.abs(row.indicator_value || 0); });
+    var max = Math.max.apply(null, values.concat([1e-9]));
+    var chart = shape("svg", { width: width, height: rows.length * barHeight + 8 });
+    rows.forEach(function (row, i) {
+      var y = i * barHeight + 4;
+      var length = Math.abs(row.indicator_value || 0) / max * (width - labelWidth - 60);
+      chart.appendChild(shape("text", { x: 0, y: y + 15 }, (i + 1) + ". " + row.company_name));
+      chart.appendChild(shape("rect", {
+        x: labelWidth, y: y + 3, width: length, height: barHeight - 6, fill: COLORS[0]
+      }));
+      chart.appendChild(shape("text", { x: labelWidth + length + 6, y: y + 15 },
+        fmt(row.indicator_value)));
+    });
+    document.getElementById("ranking").appendChild(chart);
+  }
+
+  function heatmap() {
+    document.getElementById("heatmap-title").textContent = data.year + " 风险热力图";
+    var cells = {};
+    metrics.forEach(function (row) {
+      if (row.year === data.year) { cells[row.company_name + "|" + row.indicator_name] = row; }
+    });
+    var table = el("table");
+    var header = el("tr");
+    header.appendChild(el("th", "公司"));
+    indicators.forEach(function (indicator) { header.appendChild(el("th", indicator)); });
+    table.appendChild(header);
+    names.forEach(function (name) {
+      var tr = el("tr");
+      tr.appendChild(el("td", name));
+      indicators.forEach(function (indicator) {
+        var row = cells[name + "|" + indicator];
+        var score = row ? row.risk_score : null;
+        var td = el("td", fmt(score));
+        if (score !== null) {
+          var alpha = Math.max(0, Math.min(1, score / 100));
+          td.style.background = "rgba(203, 24, 29, " + alpha.toFixed(2) + ")";
+        }
+        tr.appendChild(td);
+      });
+      table.appendChild(tr);
+    });
+    document.getElementById("heatmap").appendChild(table);
+  }
+
+  overview();
+  trends();
+  ranking();
+  heatmap();
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def _table(frame: pd.DataFrame, columns: list[str]) -> dict[str, Any]:
+    present = [column for column in columns if column in frame.columns]
+    subset = frame[present]
+    rows = subset.astype(object).where(subset.notna(), None).to_numpy().tolist()
+    return {"columns": present, "rows": rows}
+
+
+def build_html_payload(
+    metrics_df: pd.DataFrame,
+    overall_df: pd.DataFrame,
+    ranking_df: pd.DataFrame,
+    indicator: str,
+    year: int,
+) -> dict[str, Any]:
+    return {
+        "indicator": indicator,
+        "year": year,
+        "trend_indicators": TREND_INDICATORS,
+        "metrics": _table(metrics_df, HTML_METRIC_COLUMNS),
+        "overall": _table(overall_df, HTML_OVERALL_COLUMNS),
+        "ranking": _table(ranking_df, ["company_name", "indicator_value"]),
+    }
+
+
+def export_html_report(
+    metrics_df: pd.DataFrame,
+    overall_df: pd.DataFrame,
+    ranking_df: pd.DataFrame,
+    indicator: str,
+    year: int,
+    output_path: Path,
+    title: str = "财务风险看板",
+) -> Path:
+    payload = build_html_payload(metrics_df, overall_df, ranking_df, indicator, year)
+    # "</" inside the JSON would end the script element early.
+    data = dumps(payload).decode("utf-8").replace("</", "<\\/")
+    document = HTML_TEMPLATE.replace("__TITLE__", html.escape(title)).replace("__DATA__", data)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(document, encoding="utf-8")
+    return output_path
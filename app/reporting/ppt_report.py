@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import copy
+import functools
+import hashlib
+import json
 from pathlib import Path
 
 import pandas as pd
 from pptx import Presentation
 from pptx.dml.color import RGBColor
+from pptx.presentation import Presentation as PresentationType
+from pptx.slide import Slide, SlideLayout
 from pptx.util import Inches, Pt
 
-from app.reporting.charts import plot_bar, plot_trend
+from app.reporting.charts import ChartCache, ChartSpec, chart_key, render_charts
 
 RISK_RGB = {
     "low": RGBColor(198, 239, 206),
@@ -48,6 +54,137 @@ def _add_indicator_table(slide, indicators: pd.DataFrame) -> None:
             fill.fore_color.rgb = color
 
 
+TREND_INDICATORS = ["net_profit_margin", "current_ratio", "roe"]
+CONTENT_LAYOUT = 5
+# Slides are named "report:<digest>:<company>" so a later run can tell what each was built from.
+SLIDE_TAG_PREFIX = "report"
+# Bump when slide content changes, so incremental runs rebuild every company.
+SLIDE_LAYOUT_VERSION = 1
+TABLE_COLUMNS = ["year", "indicator_name", "indicator_value", "risk_level"]
+
+
+@functools.lru_cache(maxsize=8)
+def _parsed_template(path: str, mtime_ns: int, size: int) -> PresentationType:
+    # mtime/size in the key: an edited template is parsed again, an unchanged one never is.
+    return Presentation(path) if path else Presentation()
+
+
+def open_template(template_path: Path) -> PresentationType:
+    # Each deck gets a deep copy of the parsed package instead of re-reading the zip.
+    if not template_path.exists():
+        return copy.deepcopy(_parsed_template("", 0, 0))
+    stat = template_path.stat()
+    return copy.deepcopy(_parsed_template(str(template_path), stat.st_mtime_ns, stat.st_size))
+
+
+def _content_layout(presentation: PresentationType) -> SlideLayout:
+    layouts = presentation.slide_layouts
+    return layouts[CONTENT_LAYOUT] if len(layouts) > CONTENT_LAYOUT else layouts[len(layouts) - 1]
+
+
+def plan_company_charts(
+    metrics_df: pd.DataFrame, assets_dir: Path, margins_df: pd.DataFrame | None = None
+) -> dict[str, tuple[ChartSpec, ChartSpec]]:
+    plans: dict[str, tuple[ChartSpec, ChartSpec]] = {}
+    # The bar chart ranks every company, so companies sharing a latest year share one spec.
+    # margins_df supplies the cross-company rows when metrics_df only holds some companies.
+    source = metrics_df if margins_df is None else margins_df
+    margins = source[source["indicator_name"] == "net_profit_margin"]
+    bars: dict[int, ChartSpec] = {}
+    for company, company_metrics in metrics_df.groupby("company_name", sort=False):
+        latest_year = int(company_metrics["year"].max())
+        trend = ChartSpec(
+            "trend",
+            company_metrics,
+            assets_dir / f"{company}_trend.png",
+            {"company": company, "indicators": TREND_INDICATORS},
+        )
+        if latest_year not in bars:
+            bars[latest_year] = ChartSpec(
+                "bar",
+                margins[margins["year"] == latest_year],
+                assets_dir / f"net_profit_margin_{latest_year}_bar.png",
+                {"indicator": "net_profit_margin", "year": latest_year},
+            )
+        plans[str(company)] = (trend, bars[latest_year])
+    return plans
+
+
+def plan_specs(plans: dict[str, tuple[ChartSpec, ChartSpec]]) -> list[ChartSpec]:
+    unique = {id(spec): spec for specs in plans.values() for spec in specs}
+    return list(unique.values())
+
+
+def _slide_tag(slide: Slide) -> tuple[str, str] | None:
+    prefix, _, rest = slide.name.partition(":")
+    if prefix != SLIDE_TAG_PREFIX or ":" not in rest:
+        return None
+    digest, company = rest.split(":", 1)
+    return company, digest
+
+
+def _tag_slide(slide: Slide, company: str, digest: str) -> None:
+    slide._element.cSld.name = f"{SLIDE_TAG_PREFIX}:{digest}:{company}"
+
+
+def company_digest(trend: ChartSpec, bar: ChartSpec, score_text: str, ranking_text: str) -> str:
+    digest = hashlib.sha1()
+    header = [SLIDE_LAYOUT_VERSION, chart_key(trend), chart_key(bar), score_text, ranking_text]
+    digest.update(json.dumps(header, ensure_ascii=False).encode("utf-8"))
+    columns = [column for column in TABLE_COLUMNS if column in trend.data.columns]
+    table = trend.data[columns].reset_index(drop=True)
+    digest.update(pd.util.hash_pandas_object(table, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _add_company_slides(
+    presentation: PresentationType,
+    layout: SlideLayout,
+    company: str,
+    trend: ChartSpec,
+    bar: ChartSpec,
+    score_text: str,
+    ranking_text: str,
+) -> list[Slide]:
+    slide1 = presentation.slides.add_slide(layout)
+    _add_title(slide1, f"{company} 公司概览")
+    _add_textbox(slide1, score_text, 0.5, 0.8, 8.5, 0.5)
+    _add_indicator_table(slide1, trend.data)
+
+    slide2 = presentation.slides.add_slide(layout)
+    _add_title(slide2, f"{company} 趋势与排名")
+    slide2.shapes.add_picture(str(trend.output_path), Inches(0.5), Inches(1.5), width=Inches(5.5))
+
+    latest_year = bar.options["year"]
+    slide2.shapes.add_picture(str(bar.output_path), Inches(6.2), Inches(1.5), width=Inches(3.2))
+    _add_textbox(slide2, f"{latest_year} 净利润率排名:\n{ranking_text}", 0.5, 4.7, 9, 1.5)
+    return [slide1, slide2]
+
+
+def _arrange_slides(
+    presentation: PresentationType, order: list[str], digests: dict[str, str]
+) -> None:
+    # Keep untagged (template) slides first, then current company slides in plan order;
+    # slides built from outdated data or for companies no longer exported are dropped.
+    sld_id_lst = presentation.slides._sldIdLst
+    entries = list(zip(list(sld_id_lst), presentation.slides, strict=True))
+    untagged, current, dropped = [], {}, []
+    for sld_id, slide in entries:
+        tag = _slide_tag(slide)
+        if tag is None:
+            untagged.append(sld_id)
+        elif digests.get(tag[0]) == tag[1]:
+            current.setdefault(tag[0], []).append(sld_id)
+        else:
+            dropped.append(sld_id)
+    for sld_id, _ in entries:
+        sld_id_lst.remove(sld_id)
+    for sld_id in untagged + [sld_id for company in order for sld_id in current.get(company, [])]:
+        sld_id_lst.append(sld_id)
+    for sld_id in dropped:
+        presentation.part.drop_rel(sld_id.rId)
+
+
 def export_ppt_report(
     metrics_df: pd.DataFrame,
     overall_df: pd.DataFrame,
@@ -55,47 +192,57 @@ def export_ppt_report(
     assets_dir: Path,
     template_path: Path,
     ranking_df: pd.DataFrame,
+    chart_workers: int = 1,
+    chart_cache: ChartCache | None = None,
+    margins_df: pd.DataFrame | None = None,
+    incremental: bool = False,
 ) -> Path:
     assets_dir.mkdir(parents=True, exist_ok=True)
-    presentation = Presentation(str(template_path)) if template_path.exists() else Presentation()
-
-    for company in metrics_df["company_name"].unique():
-        company_metrics = metrics_df[metrics_df["company_name"] == company]
-        company_overall = overall_df[overall_df["company_name"] == company]
-        score_map: dict[int, float] = dict(
-            zip(company_overall["year"], company_overall["overall_risk_score"], strict=False)
+    plans = plan_company_charts(metrics_df, assets_dir, margins_df)
+    score_maps: dict[str, dict[int, float]] = {
+        str(company): dict(zip(group["year"], group["overall_risk_score"], strict=False))
+        for company, group in overall_df.groupby("company_name", sort=False)
+    }
+    ranking_text = "\n".join(
+        f"{company}: {value:.2f}"
+        for company, value in zip(
+            ranking_df["company_name"], ranking_df["indicator_value"], strict=True
         )
-
-        slide1 = presentation.slides.add_slide(presentation.slide_layouts[5])
-        _add_title(slide1, f"{company} 公司概览")
-        _add_textbox(
-            slide1,
-            f"总体风险分数: {score_map.get(company_metrics['year'].max(), float('nan')):.2f}",
-            0.5,
-            0.8,
-            8.5,
-            0.5,
-        )
-        _add_indicator_table(slide1, company_metrics)
-
-        slide2 = presentation.slides.add_slide(presentation.slide_layouts[5])
-        _add_title(slide2, f"{company} 趋势与排名")
-        trend_path = assets_dir / f"{company}_trend.png"
-        plot_trend(company_metrics, company, ["net_profit_margin", "current_ratio", "roe"], trend_path)
-        slide2.shapes.add_picture(str(trend_path), Inches(0.5), Inches(1.5), width=Inches(5.5))
-
-        latest_year = int(company_metrics["year"].max())
-        bar_path = assets_dir / f"{company}_bar.png"
-        plot_bar(metrics_df, "net_profit_margin", latest_year, bar_path)
-        slide2.shapes.add_picture(str(bar_path), Inches(6.2), Inches(1.5), width=Inches(3.2))
-
-        ranking_text = "\n".join(
-            [
-                f"{row['company_name']}: {row['indicator_value']:.2f}"
-                for _, row in ranking_df.iterrows()
-            ]
+    )
+
+    score_texts = {
+        company: "总体风险分数: "
+        f"{score_maps.get(company, {}).get(trend.data['year'].max(), float('nan')):.2f}"
+        for company, (trend, _) in plans.items()
+    }
+    digests = {
+        company: company_digest(trend, bar, score_texts[company], ranking_text)
+        for company, (trend, bar) in plans.items()
+    }
+
+    # Incremental runs start from the existing deck and rebuild only companies whose digest moved.
+    if incremental and output_path.exists():
+        presentation = Presentation(str(output_path))
+        built = {tag for tag in map(_slide_tag, presentation.slides) if tag is not None}
+    else:
+        presentation = open_template(template_path)
+        built = set()
+    stale = {
+        company: specs
+        for company, specs in plans.items()
+        if (company, digests[company]) not in built
+    }
+
+    # Render every needed chart up front (optionally across processes), then place them serially.
+    render_charts(plan_specs(stale), workers=chart_workers, cache=chart_cache)
+    layout = _content_layout(presentation)
+    for company, (trend, bar) in stale.items():
+        slides = _add_company_slides(
+            presentation, layout, company, trend, bar, score_texts[company], ranking_text
         )
-        _add_textbox(slide2, f"{latest_year} 净利润率排名:\n{ranking_text}", 0.5, 4.7, 9, 1.5)
+        for slide in slides:
+            _tag_slide(slide, company, digests[company])
+    _arrange_slides(presentation, list(plans), digests)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
     presentation.save(str(output_path))
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from pathlib import Path
+import functools
+import io
 import zipfile
-
+from pathlib import Path
 
 MINIMAL_PPTX_FILES = {
     "[Content_Types].xml": """<?xml version=\"1.0\" encoding=\"UTF-8\"?>
@@ -196,11 +197,21 @@ MINIMAL_PPTX_FILES = {
 }
 
 
+DEFAULT_TEMPLATE_PATH = Path("app/reporting/templates/report_template.pptx")
+
+
+@functools.cache
+def minimal_template_bytes() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as pptx:
+        for name, content in MINIMAL_PPTX_FILES.items():
+            pptx.writestr(name, content)
+    return buffer.getvalue()
+
+
 def ensure_template(path: Path) -> Path:
-    path.parent.mkdir(parents=True, exist_ok=True)
     if path.exists():
         return path
-    with zipfile.ZipFile(path, "w") as pptx:
-        for name, content in MINIMAL_PPTX_FILES.items():
-            pptx.writestr(name, content)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(minimal_template_bytes())
     return path
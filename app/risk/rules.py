@@ -16,4 +16,64 @@ RISK_RULES: dict[str, list[dict]] = {
         {"min": 0.08, "level": "medium", "score": 55},
         {"min": -1e9, "level": "high", "score": 85},
     ],
+    "revenue_yoy": [
+        {"min": 0.1, "level": "low", "score": 10},
+        {"min": 0.0, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 80},
+    ],
+    "net_profit_yoy": [
+        {"min": 0.1, "level": "low", "score": 10},
+        {"min": 0.0, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 85},
+    ],
+    "revenue_cagr_3y": [
+        {"min": 0.08, "level": "low", "score": 10},
+        {"min": 0.0, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 80},
+    ],
+    "revenue_cagr_5y": [
+        {"min": 0.08, "level": "low", "score": 10},
+        {"min": 0.0, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 80},
+    ],
+    "net_profit_cagr_3y": [
+        {"min": 0.08, "level": "low", "score": 10},
+        {"min": 0.0, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 85},
+    ],
+    "net_profit_cagr_5y": [
+        {"min": 0.08, "level": "low", "score": 10},
+        {"min": 0.0, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 85},
+    ],
+    "net_profit_margin_avg_3y": [
+        {"min": 0.2, "level": "low", "score": 10},
+        {"min": 0.1, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 80},
+    ],
+    "net_profit_margin_avg_5y": [
+        {"min": 0.2, "level": "low", "score": 10},
+        {"min": 0.1, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 80},
+    ],
+    "current_ratio_avg_3y": [
+        {"min": 1.5, "level": "low", "score": 15},
+        {"min": 1.0, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 80},
+    ],
+    "current_ratio_avg_5y": [
+        {"min": 1.5, "level": "low", "score": 15},
+        {"min": 1.0, "level": "medium", "score": 50},
+        {"min": -1e9, "level": "high", "score": 80},
+    ],
+    "roe_avg_3y": [
+        {"min": 0.15, "level": "low", "score": 10},
+        {"min": 0.08, "level": "medium", "score": 55},
+        {"min": -1e9, "level": "high", "score": 85},
+    ],
+    "roe_avg_5y": [
+        {"min": 0.15, "level": "low", "score": 10},
+        {"min": 0.08, "level": "medium", "score": 55},
+        {"min": -1e9, "level": "high", "score": 85},
+    ],
 }
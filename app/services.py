@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from app.analytics.drilldown import drilldown_facts
+from app.analytics.indicators import INDICATOR_DEFINITIONS
+from app.analytics.peer_stats import calculate_peer_stats
+from app.analytics.pipeline import resolve_subject_map, run_calc_pipeline, run_sharded_calc
+from app.analytics.ranking import build_ranking_index, top_n_companies
+from app.config import get_settings
+from app.core.errors import AppError, ErrorCode
+from app.core.metrics import time_stage
+from app.core.progress import report_progress
+from app.ingest.excel_reader import read_company_excel, read_company_profiles
+from app.ingest.normalizer import normalize_statement
+from app.reporting.bundle import BundleOptions, export_bundle
+from app.reporting.charts import ChartCache
+from app.reporting.excel_report import export_excel_report
+from app.reporting.html_report import HTML_METRIC_COLUMNS, export_html_report
+from app.reporting.ppt_report import export_ppt_report
+from app.reporting.template_generator import ensure_template
+from app.storage.repository import (
+    fetch_companies,
+    fetch_company_profiles,
+    fetch_facts,
+    fetch_facts_df,
+    fetch_facts_frame,
+    fetch_metrics_df,
+    fetch_overall_df,
+    ingest_facts,
+    iter_metrics_frames,
+    query_metrics,
+    query_peer_distribution,
+    query_peer_percentiles,
+    query_ranking,
+    replace_metrics,
+    replace_peer_stats,
+    upsert_company_profiles,
+)
+
+# Reports show the base ratios; derived time-series indicators only when --indicators names them.
+REPORT_INDICATORS = list(INDICATOR_DEFINITIONS)
+
+
+def ingest_command(
+    input_dir: str,
+    db_path: str,
+    reset: bool,
+    profiles_path: str | None = None,
+    write_lock: AbstractContextManager[Any] | None = None,
+) -> dict[str, Any]:
+    input_path = Path(input_dir)
+    all_facts = []
+    excel_files = list(input_path.glob("*.xlsx"))
+    for index, excel_file in enumerate(excel_files, start=1):
+        company_name = excel_file.stem
+        with time_stage("ingest", "parse"):
+            sheets = read_company_excel(excel_file)
+        with time_stage("ingest", "normalize"):
+            for statement_type, df in sheets.items():
+                facts = normalize_statement(company_name, statement_type, df)
+                all_facts.append(facts)
+        report_progress("parse", 0.8 * index / len(excel_files))
+
+    if not all_facts:
+        raise AppError(
+            code=ErrorCode.INVALID_REQUEST,
+            message="No Excel files found for ingestion.",
+            status_code=400,
+        )
+
+    report_progress("write", 0.8)
+    # Parsing above may run alongside other ingests; only the SQLite writes take the lock.
+    with write_lock or nullcontext():
+        with time_stage("ingest", "write"):
+            facts_df = pd.concat(all_facts, ignore_index=True)
+            total_rows = ingest_facts(db_path, facts_df, reset=reset)
+        payload: dict[str, Any] = {"ingested_rows": total_rows}
+        if profiles_path:
+            profiles_df = read_company_profiles(Path(profiles_path))
+            payload["profiles"] = upsert_company_profiles(db_path, profiles_df)
+    return payload
+
+
+def calc_command(db_path: str, missing_strategy: str, workers: int = 1) -> dict[str, Any]:
+    if not fetch_companies(db_path):
+        raise AppError(
+            code=ErrorCode.VALIDATION_ERROR,
+            message="No facts found. Run ingest first.",
+            status_code=400,
+        )
+
+    settings = get_settings()
+    report_progress("indicators", 0.0)
+    if workers > 1:
+        result = run_sharded_calc(db_path, missing_strategy, settings.indicator_weights, workers)
+    else:
+        subject_map = resolve_subject_map(db_path)
+        facts_df = fetch_facts_df(db_path)
+        result = run_calc_pipeline(
+            facts_df, missing_strategy, settings.indicator_weights, subject_map
+        )
+
+    report_progress("write", 0.7)
+    with time_stage("calc", "write"):
+        replace_metrics(
+            db_path, result.metrics, result.overall, build_ranking_index(result.metrics)
+        )
+    report_progress("peer_stats", 0.9)
+    with time_stage("calc", "peer_stats"):
+        peer_stats = calculate_peer_stats(result.metrics, fetch_company_profiles(db_path))
+        replace_peer_stats(db_path, peer_stats.percentiles, peer_stats.distribution)
+    return {"metrics_rows": len(result.metrics), "warnings": result.warnings}
+
+
+def query_command(db_path: str, company: str | None, year: int | None, indicator: str | None) -> dict[str, Any]:
+    return {"items": query_metrics(db_path, company, year, indicator)}
+
+
+def rank_command(db_path: str, indicator: str, year: int, n: int, order: str) -> dict[str, Any]:
+    ranking_df = query_ranking(db_path, indicator, year, n=n, order=order)
+    return {"items": ranking_df.to_dict(orient="records")}
+
+
+def peers_command(
+    db_path: str,
+    view: str,
+    company: str | None,
+    year: int | None,
+    indicator: str | None,
+    peer_group: str | None,
+) -> dict[str, Any]:
+    if view == "distribution":
+        return {"items": query_peer_distribution(db_path, year, indicator, peer_group)}
+    return {"items": query_peer_percentiles(db_path, company, year, indicator, peer_group)}
+
+
+def drilldown_command(
+    db_path: str,
+    company: str,
+    year: int,
+    statement_type: str,
+    subject_prefix: str,
+) -> dict[str, Any]:
+    facts_records = fetch_facts(db_path)
+    facts_df = pd.DataFrame(facts_records)
+    result = drilldown_facts(facts_df, company, year, statement_type, subject_prefix)
+    return {"items": result.to_dict(orient="records")}
+
+
+def _ranking_frame(
+    db_path: str, indicator: str, year: int, n: int, companies: list[str] | None
+) -> pd.DataFrame:
+    # Only the ranked indicator/year rows are needed, not the metrics the report shows.
+    scoped = fetch_metrics_df(db_path, companies=companies, years=[year], indicators=[indicator])
+    return top_n_companies(scoped, indicator, year, n=n)
+
+
+def export_excel_command(
+    db_path: str,
+    output_path: str,
+    indicator: str,
+    year: int,
+    n: int,
+    company: str | None,
+    statement_type: str | None,
+    subject_prefix: str | None,
+    workers: int = 1,
+    bundle_dir: str | None = None,
+    zip_bundle: bool = False,
+    companies: list[str] | None = None,
+    years: list[int] | None = None,
+    indicators: list[str] | None = None,
+) -> dict[str, Any]:
+    indicators = indicators or REPORT_INDICATORS
+    with time_stage("export_excel", "load"):
+        ranking_df = _ranking_frame(db_path, indicator, year, n, companies)
+    if bundle_dir:
+        options = BundleOptions(
+            "excel",
+            year,
+            ranking_df,
+            statement_type=statement_type,
+            subject_prefix=subject_prefix,
+            years=years,
+            indicators=indicators,
+        )
+        with time_stage("export_excel", "render"):
+            return export_bundle(
+                db_path,
+                Path(bundle_dir),
+                options,
+                workers=workers,
+                companies=companies,
+                zip_output=zip_bundle,
+            )
+    with time_stage("export_excel", "load"):
+        drilldown_df = None
+        if company and statement_type and subject_prefix:
+            drilldown_df = fetch_facts_frame(db_path, company, year, statement_type, subject_prefix)
+    report_progress("render", 0.3)
+    with time_stage("export_excel", "render"):
+        # Metrics stream from SQLite in chunks, so the full table is never held in memory.
+        output_file = export_excel_report(
+            iter_metrics_frames(db_path, companies, years, indicators),
+            ranking_df,
+            drilldown_df,
+            Path(output_path),
+        )
+    return {"path": str(output_file)}
+
+
+def export_ppt_command(
+    db_path: str,
+    output_path: str,
+    assets_dir: str,
+    template_path: str,
+    indicator: str,
+    year: int,
+    n: int,
+    workers: int = 1,
+    bundle_dir: str | None = None,
+    zip_bundle: bool = False,
+    companies: list[str] | None = None,
+    years: list[int] | None = None,
+    indicators: list[str] | None = None,
+    incremental: bool = False,
+) -> dict[str, Any]:
+    indicators = indicators or REPORT_INDICATORS
+    cache_bytes = get_settings().chart_cache_max_bytes
+    if bundle_dir:
+        # One deck per company: workers split companies and each reads only its own rows.
+        with time_stage("export_ppt", "load"):
+            options = BundleOptions(
+                "ppt",
+                year,
+                _ranking_frame(db_path, indicator, year, n, companies),
+                years=years,
+                indicators=indicators,
+                margins=fetch_metrics_df(db_path, companies, years, ["net_profit_margin"]),
+                template_path=ensure_template(Path(template_path)),
+                assets_dir=Path(assets_dir),
+                chart_cache_max_bytes=cache_bytes,
+            )
+        with time_stage("export_ppt", "render"):
+            return export_bundle(
+                db_path,
+                Path(bundle_dir),
+                options,
+                workers=workers,
+                companies=companies,
+                zip_output=zip_bundle,
+            )
+    chart_cache = ChartCache(Path(assets_dir) / "cache", cache_bytes) if cache_bytes > 0 else None
+    with time_stage("export_ppt", "load"):
+        metrics_df = fetch_metrics_df(db_path, companies, years, indicators)
+        overall_df = fetch_overall_df(db_path, companies, years)
+        ranking_df = _ranking_frame(db_path, indicator, year, n, companies)
+        margins_df = None
+        if indicators is not None and "net_profit_margin" not in indicators:
+            # The bar chart always shows net profit margin, even when it is not in scope.
+            margins_df = fetch_metrics_df(db_path, companies, years, ["net_profit_margin"])
+        template_file = ensure_template(Path(template_path))
+    report_progress("render", 0.3)
+    with time_stage("export_ppt", "render"):
+        output_file = export_ppt_report(
+            metrics_df,
+            overall_df,
+            Path(output_path),
+            Path(assets_dir),
+            template_file,
+            ranking_df,
+            chart_workers=workers,
+            chart_cache=chart_cache,
+            margins_df=margins_df,
+            incremental=incremental,
+        )
+    return {"path": str(output_file)}
+
+
+def export_html_command(
+    db_path: str,
+    output_path: str,
+    indicator: str,
+    year: int,
+    n: int,
+    companies: list[str] | None = None,
+    years: list[int] | None = None,
+    indicators: list[str] | None = None,
+) -> dict[str, Any]:
+    indicators = indicators or REPORT_INDICATORS
+    with time_stage("export_html", "load"):
+        metrics_df = fetch_metrics_df(
+            db_path, companies, years, indicators, columns=HTML_METRIC_COLUMNS
+        )
+        overall_df = fetch_overall_df(db_path, companies, years)
+        ranking_df = _ranking_frame(db_path, indicator, year, n, companies)
+    report_progress("render", 0.3)
+    with time_stage("export_html", "render"):
+        output_file = export_html_report(
+            metrics_df, overall_df, ranking_df, indicator, year, Path(output_path)
+        )
+    return {"path": str(output_file)}
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.config import get_settings
+from app.storage.repository import query_peer_distribution, query_peer_percentiles
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_settings().db_max_workers, thread_name_prefix="db"
+        )
+    return _executor
+
+
+def shutdown_db_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_in_db_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def query_peer_percentiles_async(
+    db_path: str,
+    company: str | None = None,
+    year: int | None = None,
+    indicator: str | None = None,
+    peer_group: str | None = None,
+) -> list[dict[str, Any]]:
+    return await run_in_db_executor(
+        query_peer_percentiles, db_path, company, year, indicator, peer_group
+    )
+
+
+async def query_peer_distribution_async(
+    db_path: str,
+    year: int | None = None,
+    indicator: str | None = None,
+    peer_group: str | None = None,
+) -> list[dict[str, Any]]:
+    return await run_in_db_executor(query_peer_distribution, db_path, year, indicator, peer_group)
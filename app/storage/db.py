@@ -1,16 +1,35 @@
 from __future__ import annotations
 
+import os
 import sqlite3
+import time
+import uuid
 from pathlib import Path
 
 
-def get_connection(db_path: str) -> sqlite3.Connection:
+def get_connection(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+# File timestamps can be as coarse as a few milliseconds (seconds on some filesystems), so a
+# file modified this recently may still receive another commit with the same stat.
+SIGNATURE_SETTLE_NS = 2_000_000_000
+
+
+def database_signature(db_path: str) -> tuple[int, int, int, int] | None:
+    # Cheap change signal for the database file; None when it cannot be trusted yet.
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    if time.time_ns() - stat.st_mtime_ns < SIGNATURE_SETTLE_NS:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
 def init_db(conn: sqlite3.Connection) -> None:
     cursor = conn.cursor()
     cursor.execute(
@@ -41,6 +60,19 @@ def init_db(conn: sqlite3.Connection) -> None:
         )
         """
     )
+    # Report exports scope metrics by company, or by indicator and year.
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_metrics_company
+        ON metrics_table (company_name, year, indicator_name)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_metrics_indicator_year
+        ON metrics_table (indicator_name, year)
+        """
+    )
     cursor.execute(
         """
         CREATE TABLE IF NOT EXISTS overall_risk (
@@ -50,4 +82,136 @@ def init_db(conn: sqlite3.Connection) -> None:
         )
         """
     )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_overall_risk_company
+        ON overall_risk (company_name, year)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL,
+            epoch TEXT
+        )
+        """
+    )
+    _seed_generation(cursor)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ranking_index (
+            indicator_name TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            ordinal_rank INTEGER NOT NULL,
+            dense_rank INTEGER NOT NULL,
+            percentile REAL NOT NULL,
+            company_name TEXT NOT NULL,
+            indicator_value REAL NOT NULL,
+            risk_level TEXT,
+            risk_score REAL,
+            details TEXT
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_ranking_index_lookup
+        ON ranking_index (indicator_name, year, ordinal_rank)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS company_profiles (
+            company_name TEXT PRIMARY KEY,
+            industry TEXT,
+            size_bucket TEXT
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS peer_percentiles (
+            company_name TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            indicator_name TEXT NOT NULL,
+            indicator_value REAL,
+            peer_group TEXT NOT NULL,
+            peer_percentile REAL,
+            peer_size INTEGER
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS peer_distribution (
+            peer_group TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            indicator_name TEXT NOT NULL,
+            count INTEGER,
+            mean REAL,
+            std REAL,
+            p10 REAL,
+            p25 REAL,
+            p50 REAL,
+            p75 REAL,
+            p90 REAL
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS subject_rule_map (
+            subject_path TEXT NOT NULL,
+            rule_name TEXT,
+            rules_version TEXT NOT NULL
+        )
+        """
+    )
+    _ensure_subject_rule_map_unique(cursor)
     conn.commit()
+
+
+def _seed_generation(cursor: sqlite3.Cursor) -> None:
+    # init_db runs on every read, so this only writes once: when the database is new
+    # or predates the epoch column. The random epoch tells a recreated file
+    # (ingest --reset) apart from the old one even when the generation counts match.
+    try:
+        row = cursor.execute("SELECT epoch FROM data_generation WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        cursor.execute("ALTER TABLE data_generation ADD COLUMN epoch TEXT")
+        row = None
+    if row is None or row[0] is None:
+        cursor.execute(
+            "INSERT INTO data_generation (id, generation, epoch) VALUES (1, 0, ?) "
+            "ON CONFLICT (id) DO UPDATE SET epoch = COALESCE(epoch, excluded.epoch)",
+            (uuid.uuid4().hex,),
+        )
+
+
+def _ensure_subject_rule_map_unique(cursor: sqlite3.Cursor) -> None:
+    # Concurrent calcs (CLI and job) may classify the same paths; the unique index lets
+    # both write with INSERT OR IGNORE. A path has one rule per rules version, and keying
+    # on the path also covers unmatched (NULL rule) rows, which SQLite never treats as
+    # equal. Older files can already hold duplicates, so they are collapsed first.
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_subject_rule_map'"
+    ).fetchone()
+    if exists:
+        return
+    cursor.execute(
+        "DELETE FROM subject_rule_map WHERE rowid NOT IN ("
+        "SELECT MIN(rowid) FROM subject_rule_map "
+        "GROUP BY rules_version, subject_path)"
+    )
+    cursor.execute("DROP INDEX IF EXISTS idx_subject_rule_map_version")
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_subject_rule_map
+        ON subject_rule_map (rules_version, subject_path)
+        """
+    )
+
+
+def bump_generation(conn: sqlite3.Connection) -> None:
+    conn.execute("UPDATE data_generation SET generation = generation + 1 WHERE id = 1")
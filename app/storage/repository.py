@@ -1,35 +1,257 @@
 from __future__ import annotations
 
 import json
+import sqlite3
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
 from typing import Any
 
 import pandas as pd
 
-from app.storage.db import get_connection, init_db
+from app.core.errors import AppError, ErrorCode
+from app.core.metrics import DB_QUERY_LATENCY, FRAME_BUILD_LATENCY
+from app.storage.db import bump_generation, get_connection, init_db
 
+DbSource = str | sqlite3.Connection
 
-def ingest_facts(db_path: str, facts: pd.DataFrame) -> int:
-    with get_connection(db_path) as conn:
+METRICS_COLUMNS = [
+    "company_name",
+    "year",
+    "indicator_name",
+    "indicator_value",
+    "risk_level",
+    "risk_score",
+    "details",
+]
+FACTS_COLUMNS = [
+    "company_name",
+    "statement_type",
+    "category",
+    "subject_path",
+    "subject_l1",
+    "subject_l2",
+    "subject_l3",
+    "year",
+    "amount",
+]
+
+
+@contextmanager
+def _reader(db: DbSource) -> Iterator[sqlite3.Connection]:
+    if isinstance(db, sqlite3.Connection):
+        yield db
+        return
+    with get_connection(db) as conn:
         init_db(conn)
-        facts.to_sql("financial_facts", conn, if_exists="append", index=False)
-    return len(facts)
+        yield conn
 
 
-def replace_metrics(db_path: str, metrics: pd.DataFrame, overall: pd.DataFrame) -> None:
-    with get_connection(db_path) as conn:
+@contextmanager
+def read_snapshot(db_path: str) -> Iterator[sqlite3.Connection]:
+    conn = get_connection(db_path)
+    try:
         init_db(conn)
+        # One read transaction so every statement sees the same committed state.
+        conn.execute("BEGIN")
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@contextmanager
+def _write_transaction(db_path: str) -> Iterator[sqlite3.Connection]:
+    conn = get_connection(db_path)
+    try:
+        init_db(conn)
+        # One explicit transaction for the deletes, the inserts and the generation bump;
+        # DataFrame.to_sql commits on its own, so rows go through _insert_frame instead.
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _insert_frame(conn: sqlite3.Connection, table: str, frame: pd.DataFrame) -> None:
+    rows = frame.astype(object).where(frame.notna(), None)
+    columns = ", ".join(rows.columns)
+    placeholders = ", ".join("?" * len(rows.columns))
+    conn.executemany(
+        f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+        rows.itertuples(index=False, name=None),
+    )
+
+
+# Emptied by ingest --reset. subject_rule_map only depends on the rules, so it is kept.
+RESET_TABLES = [
+    "financial_facts",
+    "metrics_table",
+    "overall_risk",
+    "ranking_index",
+    "company_profiles",
+    "peer_percentiles",
+    "peer_distribution",
+]
+
+
+def ingest_facts(db_path: str, facts: pd.DataFrame, reset: bool = False) -> int:
+    with _write_transaction(db_path) as conn:
+        if reset:
+            # Cleared in the insert's transaction instead of unlinking the file, so open
+            # readers keep a consistent snapshot and never see an empty database.
+            for table in RESET_TABLES:
+                conn.execute(f"DELETE FROM {table}")
+        _insert_frame(conn, "financial_facts", facts)
+        bump_generation(conn)
+    return len(facts)
+
+
+RANKING_COLUMNS = [
+    "indicator_name",
+    "year",
+    "ordinal_rank",
+    "dense_rank",
+    "percentile",
+    "company_name",
+    "indicator_value",
+    "risk_level",
+    "risk_score",
+    "details",
+]
+
+
+def replace_metrics(
+    db_path: str,
+    metrics: pd.DataFrame,
+    overall: pd.DataFrame,
+    ranking: pd.DataFrame | None = None,
+) -> None:
+    with _write_transaction(db_path) as conn:
         conn.execute("DELETE FROM metrics_table")
         conn.execute("DELETE FROM overall_risk")
-        metrics.to_sql("metrics_table", conn, if_exists="append", index=False)
-        overall.to_sql("overall_risk", conn, if_exists="append", index=False)
+        conn.execute("DELETE FROM ranking_index")
+        _insert_frame(conn, "metrics_table", metrics)
+        _insert_frame(conn, "overall_risk", overall)
+        if ranking is not None:
+            _insert_frame(conn, "ranking_index", ranking.reindex(columns=RANKING_COLUMNS))
+        bump_generation(conn)
 
 
-def query_metrics(
+@DB_QUERY_LATENCY.timed(operation="fetch_data_generation")
+def fetch_data_generation(db_path: str) -> str:
+    # "<epoch>:<generation>"; a missing row reads as generation 0 of an unnamed epoch.
+    with get_connection(db_path) as conn:
+        init_db(conn)
+        row = conn.execute(
+            "SELECT epoch, generation FROM data_generation WHERE id = 1"
+        ).fetchone()
+    return f"{row[0] or ''}:{int(row[1])}" if row else ":0"
+
+
+def upsert_company_profiles(db_path: str, profiles: pd.DataFrame) -> int:
+    rows = profiles.reindex(columns=["company_name", "industry", "size_bucket"])
+    rows = rows.astype(object).where(rows.notna(), None)
+    with get_connection(db_path) as conn:
+        init_db(conn)
+        conn.executemany(
+            "INSERT OR REPLACE INTO company_profiles (company_name, industry, size_bucket) "
+            "VALUES (?, ?, ?)",
+            rows.itertuples(index=False, name=None),
+        )
+    return len(rows)
+
+
+@FRAME_BUILD_LATENCY.timed(operation="fetch_company_profiles")
+def fetch_company_profiles(db_path: str) -> pd.DataFrame:
+    with get_connection(db_path) as conn:
+        init_db(conn)
+        return pd.read_sql_query("SELECT * FROM company_profiles", conn)
+
+
+def replace_peer_stats(db_path: str, percentiles: pd.DataFrame, distribution: pd.DataFrame) -> None:
+    with _write_transaction(db_path) as conn:
+        conn.execute("DELETE FROM peer_percentiles")
+        conn.execute("DELETE FROM peer_distribution")
+        _insert_frame(conn, "peer_percentiles", percentiles)
+        _insert_frame(conn, "peer_distribution", distribution)
+
+
+def _select_rows(
+    db_path: str, table: str, filters: dict[str, Any], order_by: str
+) -> list[dict[str, Any]]:
+    clauses: list[str] = []
+    params: list[Any] = []
+    for column, value in filters.items():
+        if value is None or value == "":
+            continue
+        clauses.append(f"{column} = ?")
+        params.append(value)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = f"SELECT * FROM {table} {where} ORDER BY {order_by}"
+
+    with get_connection(db_path) as conn:
+        init_db(conn)
+        rows = conn.execute(query, params).fetchall()
+    return [dict(row) for row in rows]
+
+
+@DB_QUERY_LATENCY.timed(operation="query_peer_percentiles")
+def query_peer_percentiles(
     db_path: str,
     company: str | None = None,
     year: int | None = None,
     indicator: str | None = None,
+    peer_group: str | None = None,
 ) -> list[dict[str, Any]]:
+    filters = {
+        "company_name": company,
+        "year": year,
+        "indicator_name": indicator,
+        "peer_group": peer_group,
+    }
+    return _select_rows(
+        db_path, "peer_percentiles", filters, "company_name, year, indicator_name"
+    )
+
+
+@DB_QUERY_LATENCY.timed(operation="query_peer_distribution")
+def query_peer_distribution(
+    db_path: str,
+    year: int | None = None,
+    indicator: str | None = None,
+    peer_group: str | None = None,
+) -> list[dict[str, Any]]:
+    filters = {"year": year, "indicator_name": indicator, "peer_group": peer_group}
+    return _select_rows(
+        db_path, "peer_distribution", filters, "peer_group, year, indicator_name"
+    )
+
+
+def _select_list(columns: Sequence[str] | None, available: list[str]) -> str:
+    if not columns:
+        return "*"
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise AppError(
+            code=ErrorCode.INVALID_REQUEST,
+            message="Unknown columns requested.",
+            status_code=400,
+            details={"unknown": unknown, "available": available},
+        )
+    return ", ".join(dict.fromkeys(columns))
+
+
+def _metrics_query(
+    company: str | None,
+    year: int | None,
+    indicator: str | None,
+    columns: Sequence[str] | None = None,
+) -> tuple[str, list[Any]]:
     clauses: list[str] = []
     params: list[Any] = []
     if company:
@@ -43,27 +265,135 @@ def query_metrics(
         params.append(indicator)
 
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
-    query = f"SELECT * FROM metrics_table {where} ORDER BY company_name, year"
+    select = _select_list(columns, METRICS_COLUMNS)
+    return f"SELECT {select} FROM metrics_table {where} ORDER BY company_name, year", params
 
-    with get_connection(db_path) as conn:
-        init_db(conn)
+
+def _scope_clauses(
+    companies: Sequence[str] | None = None,
+    years: Sequence[int] | None = None,
+    indicators: Sequence[str] | None = None,
+) -> tuple[list[str], list[Any]]:
+    clauses: list[str] = []
+    params: list[Any] = []
+    for column, values in (
+        ("company_name", companies),
+        ("year", years),
+        ("indicator_name", indicators),
+    ):
+        if values is not None:
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+    return clauses, params
+
+
+def _scoped_metrics_query(
+    companies: Sequence[str] | None,
+    years: Sequence[int] | None,
+    indicators: Sequence[str] | None,
+    columns: Sequence[str] | None,
+) -> tuple[str, list[Any]]:
+    clauses, params = _scope_clauses(companies, years, indicators)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    select = _select_list(columns, METRICS_COLUMNS)
+    return f"SELECT {select} FROM metrics_table {where}", params
+
+
+def _metric_record(row: Any) -> dict[str, Any]:
+    record = dict(row)
+    if record.get("details"):
+        record["details"] = json.loads(record["details"])
+    return record
+
+
+@DB_QUERY_LATENCY.timed(operation="query_metrics")
+def query_metrics(
+    db_path: DbSource,
+    company: str | None = None,
+    year: int | None = None,
+    indicator: str | None = None,
+    columns: Sequence[str] | None = None,
+) -> list[dict[str, Any]]:
+    query, params = _metrics_query(company, year, indicator, columns)
+    with _reader(db_path) as conn:
         rows = conn.execute(query, params).fetchall()
-    results: list[dict[str, Any]] = []
-    for row in rows:
-        record = dict(row)
-        if record.get("details"):
-            record["details"] = json.loads(record["details"])
-        results.append(record)
-    return results
+    return [_metric_record(row) for row in rows]
 
 
-def fetch_facts(
+@FRAME_BUILD_LATENCY.timed(operation="fetch_metrics_frame")
+def fetch_metrics_frame(
+    db_path: DbSource,
+    company: str | None = None,
+    year: int | None = None,
+    indicator: str | None = None,
+    columns: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    # details stays raw JSON text here; columnar consumers decode it themselves if needed.
+    query, params = _metrics_query(company, year, indicator, columns)
+    with _reader(db_path) as conn:
+        return pd.read_sql_query(query, conn, params=params)
+
+
+def iter_metrics_frames(
+    db_path: DbSource,
+    companies: Sequence[str] | None = None,
+    years: Sequence[int] | None = None,
+    indicators: Sequence[str] | None = None,
+    columns: Sequence[str] | None = None,
+    chunksize: int = 10000,
+) -> Iterator[pd.DataFrame]:
+    query, params = _scoped_metrics_query(companies, years, indicators, columns)
+    query += " ORDER BY company_name, year"
+    with _reader(db_path) as conn:
+        yield from pd.read_sql_query(query, conn, params=params, chunksize=chunksize)
+
+
+def _iter_rows(
+    db_path: str, query: str, params: list[Any], batch_size: int
+) -> Iterator[list[Any]]:
+    # Streaming responses pull batches from worker threads, so the connection must be shareable.
+    conn = get_connection(db_path, check_same_thread=False)
+    try:
+        init_db(conn)
+        cursor = conn.execute(query, params)
+        while rows := cursor.fetchmany(batch_size):
+            yield rows
+    finally:
+        conn.close()
+
+
+def _iter_records(
+    db_path: str,
+    query: str,
+    params: list[Any],
+    batch_size: int,
+    record: Callable[[Any], dict[str, Any]],
+) -> Iterator[list[dict[str, Any]]]:
+    for rows in _iter_rows(db_path, query, params, batch_size):
+        yield [record(row) for row in rows]
+
+
+def iter_metrics(
     db_path: str,
     company: str | None = None,
     year: int | None = None,
-    statement_type: str | None = None,
-    subject_prefix: str | None = None,
-) -> list[dict[str, Any]]:
+    indicator: str | None = None,
+    columns: Sequence[str] | None = None,
+    batch_size: int = 1000,
+) -> Iterator[list[dict[str, Any]]]:
+    # Not a generator itself: the query is built (and columns validated) on the call, so
+    # a bad request fails before a streaming response has sent its status line.
+    query, params = _metrics_query(company, year, indicator, columns)
+    return _iter_records(db_path, query, params, batch_size, _metric_record)
+
+
+def _facts_query(
+    company: str | None,
+    year: int | None,
+    statement_type: str | None,
+    subject_prefix: str | None,
+    columns: Sequence[str] | None = None,
+) -> tuple[str, list[Any]]:
     clauses: list[str] = []
     params: list[Any] = []
     if company:
@@ -76,18 +406,108 @@ def fetch_facts(
         clauses.append("statement_type = ?")
         params.append(statement_type)
     if subject_prefix:
-        clauses.append("subject_path LIKE ?")
-        params.append(f"{subject_prefix}%")
+        # LIKE narrows the scan; substr keeps exact, case-sensitive prefix semantics
+        # since LIKE ignores case and treats % and _ as wildcards.
+        clauses.append("subject_path LIKE ? AND substr(subject_path, 1, ?) = ?")
+        params.extend([f"{subject_prefix}%", len(subject_prefix), subject_prefix])
 
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
-    query = f"SELECT * FROM financial_facts {where} ORDER BY subject_path"
+    select = _select_list(columns, FACTS_COLUMNS)
+    return f"SELECT {select} FROM financial_facts {where} ORDER BY subject_path", params
 
-    with get_connection(db_path) as conn:
-        init_db(conn)
+
+@DB_QUERY_LATENCY.timed(operation="fetch_facts")
+def fetch_facts(
+    db_path: DbSource,
+    company: str | None = None,
+    year: int | None = None,
+    statement_type: str | None = None,
+    subject_prefix: str | None = None,
+    columns: Sequence[str] | None = None,
+) -> list[dict[str, Any]]:
+    query, params = _facts_query(company, year, statement_type, subject_prefix, columns)
+    with _reader(db_path) as conn:
         rows = conn.execute(query, params).fetchall()
     return [dict(row) for row in rows]
 
 
+@FRAME_BUILD_LATENCY.timed(operation="fetch_facts_frame")
+def fetch_facts_frame(
+    db_path: DbSource,
+    company: str | None = None,
+    year: int | None = None,
+    statement_type: str | None = None,
+    subject_prefix: str | None = None,
+    columns: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    query, params = _facts_query(company, year, statement_type, subject_prefix, columns)
+    with _reader(db_path) as conn:
+        return pd.read_sql_query(query, conn, params=params)
+
+
+def iter_facts(
+    db_path: str,
+    company: str | None = None,
+    year: int | None = None,
+    statement_type: str | None = None,
+    subject_prefix: str | None = None,
+    columns: Sequence[str] | None = None,
+    batch_size: int = 1000,
+) -> Iterator[list[dict[str, Any]]]:
+    query, params = _facts_query(company, year, statement_type, subject_prefix, columns)
+    return _iter_records(db_path, query, params, batch_size, dict)
+
+
+@FRAME_BUILD_LATENCY.timed(operation="fetch_facts_df")
+def fetch_facts_df(db_path: str, companies: list[str] | None = None) -> pd.DataFrame:
+    clauses: list[str] = []
+    params: list[Any] = []
+    if companies is not None:
+        placeholders = ", ".join("?" for _ in companies)
+        clauses.append(f"company_name IN ({placeholders})")
+        params.extend(companies)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = f"SELECT * FROM financial_facts {where}"
+
+    with get_connection(db_path) as conn:
+        init_db(conn)
+        return pd.read_sql_query(query, conn, params=params)
+
+
+@DB_QUERY_LATENCY.timed(operation="fetch_subject_paths")
+def fetch_subject_paths(db_path: str) -> list[str]:
+    with get_connection(db_path) as conn:
+        init_db(conn)
+        rows = conn.execute("SELECT DISTINCT subject_path FROM financial_facts").fetchall()
+    return [row[0] for row in rows]
+
+
+@FRAME_BUILD_LATENCY.timed(operation="fetch_subject_rule_map")
+def fetch_subject_rule_map(db_path: str, rules_version: str) -> pd.DataFrame:
+    with get_connection(db_path) as conn:
+        init_db(conn)
+        return pd.read_sql_query(
+            "SELECT subject_path, rule_name FROM subject_rule_map WHERE rules_version = ?",
+            conn,
+            params=[rules_version],
+        )
+
+
+def save_subject_rule_map(db_path: str, mapping: pd.DataFrame, rules_version: str) -> None:
+    with get_connection(db_path) as conn:
+        init_db(conn)
+        conn.execute("DELETE FROM subject_rule_map WHERE rules_version != ?", [rules_version])
+        rows = mapping.reindex(columns=["subject_path", "rule_name"])
+        rows = rows.astype(object).where(rows.notna(), None)
+        conn.executemany(
+            "INSERT OR IGNORE INTO subject_rule_map (subject_path, rule_name, rules_version) "
+            "VALUES (?, ?, ?)",
+            ((path, rule, rules_version) for path, rule in rows.itertuples(index=False)),
+        )
+
+
+@DB_QUERY_LATENCY.timed(operation="fetch_companies")
 def fetch_companies(db_path: str) -> list[str]:
     with get_connection(db_path) as conn:
         init_db(conn)
@@ -95,6 +515,7 @@ def fetch_companies(db_path: str) -> list[str]:
     return [row[0] for row in rows]
 
 
+@DB_QUERY_LATENCY.timed(operation="fetch_years")
 def fetch_years(db_path: str) -> list[int]:
     with get_connection(db_path) as conn:
         init_db(conn)
@@ -102,13 +523,80 @@ def fetch_years(db_path: str) -> list[int]:
     return [row[0] for row in rows]
 
 
-def fetch_metrics_df(db_path: str) -> pd.DataFrame:
-    with get_connection(db_path) as conn:
-        init_db(conn)
-        return pd.read_sql_query("SELECT * FROM metrics_table", conn)
+@FRAME_BUILD_LATENCY.timed(operation="fetch_metrics_df")
+def fetch_metrics_df(
+    db_path: DbSource,
+    companies: Sequence[str] | None = None,
+    years: Sequence[int] | None = None,
+    indicators: Sequence[str] | None = None,
+    columns: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    query, params = _scoped_metrics_query(companies, years, indicators, columns)
+    with _reader(db_path) as conn:
+        return pd.read_sql_query(query, conn, params=params)
 
 
-def fetch_overall_df(db_path: str) -> pd.DataFrame:
+@DB_QUERY_LATENCY.timed(operation="has_ranking_index")
+def has_ranking_index(db_path: DbSource) -> bool:
+    with _reader(db_path) as conn:
+        return conn.execute("SELECT 1 FROM ranking_index LIMIT 1").fetchone() is not None
+
+
+@FRAME_BUILD_LATENCY.timed(operation="fetch_ranking")
+def fetch_ranking(
+    db_path: DbSource,
+    indicator: str,
+    year: int,
+    n: int = 5,
+    order: str = "desc",
+) -> pd.DataFrame:
+    # ordinal_rank already breaks value ties by company name, in both directions.
+    order_by = "indicator_value ASC, ordinal_rank" if order == "asc" else "ordinal_rank"
+    query = (
+        "SELECT company_name, year, indicator_name, indicator_value, risk_level, risk_score, "
+        "details, ordinal_rank, dense_rank, percentile FROM ranking_index "
+        f"WHERE indicator_name = ? AND year = ? ORDER BY {order_by} LIMIT ?"
+    )
+    with _reader(db_path) as conn:
+        return pd.read_sql_query(query, conn, params=[indicator, year, max(n, 0)])
+
+
+@FRAME_BUILD_LATENCY.timed(operation="query_ranking")
+def query_ranking(
+    db_path: DbSource,
+    indicator: str,
+    year: int,
+    n: int = 5,
+    order: str = "desc",
+) -> pd.DataFrame:
+    if has_ranking_index(db_path):
+        return fetch_ranking(db_path, indicator, year, n=n, order=order)
+
+    direction = "ASC" if order == "asc" else "DESC"
+    with _reader(db_path) as conn:
+        if conn.execute("SELECT 1 FROM metrics_table LIMIT 1").fetchone() is None:
+            raise AppError(
+                code=ErrorCode.VALIDATION_ERROR,
+                message="No metrics found. Run calc first.",
+                status_code=400,
+            )
+        return pd.read_sql_query(
+            "SELECT * FROM metrics_table WHERE indicator_name = ? AND year = ? "
+            "AND indicator_value IS NOT NULL "
+            f"ORDER BY indicator_value {direction}, company_name LIMIT ?",
+            conn,
+            params=[indicator, year, max(n, 0)],
+        )
+
+
+@FRAME_BUILD_LATENCY.timed(operation="fetch_overall_df")
+def fetch_overall_df(
+    db_path: str,
+    companies: Sequence[str] | None = None,
+    years: Sequence[int] | None = None,
+) -> pd.DataFrame:
+    clauses, params = _scope_clauses(companies, years)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
     with get_connection(db_path) as conn:
         init_db(conn)
-        return pd.read_sql_query("SELECT * FROM overall_risk", conn)
+        return pd.read_sql_query(f"SELECT * FROM overall_risk {where}", conn, params=params)
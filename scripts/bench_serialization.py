@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core import columnar, serialization
+from app.core.response import build_response_data
+
+ROWS = 100_000
+
+
+def build_frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=ROWS)
+    values[::50] = np.nan
+    df = pd.DataFrame(
+        {
+            "company_name": [f"公司{idx % 3000}" for idx in range(ROWS)],
+            "year": rng.integers(2015, 2024, size=ROWS),
+            "indicator_name": rng.choice(["net_profit_margin", "current_ratio", "roe"], size=ROWS),
+            "indicator_value": values,
+            "risk_level": rng.choice(["low", "medium", "high"], size=ROWS),
+            "risk_score": rng.choice([10.0, 50.0, 80.0], size=ROWS),
+        }
+    )
+    return df
+
+
+def bench(label: str, func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<32} {best * 1000:8.1f} ms  {len(payload) / 1024 / 1024:6.2f} MiB")
+    return best
+
+
+def main() -> None:
+    frame = build_frame()
+    envelope = build_response_data({"items": frame.to_dict(orient="records")}, "bench")
+    # The stdlib baseline emits invalid NaN tokens; it is shown for speed only.
+    baseline = bench(
+        "json.dumps (stdlib)", lambda: json.dumps(envelope, ensure_ascii=False).encode("utf-8")
+    )
+    fast = bench("serialization.dumps", lambda: serialization.dumps(envelope))
+    orjson_module = serialization.orjson
+    serialization.orjson = None
+    try:
+        bench("serialization.dumps (no orjson)", lambda: serialization.dumps(envelope))
+    finally:
+        serialization.orjson = orjson_module
+    print(f"speedup: {baseline / fast:.1f}x ({'orjson' if orjson_module else 'stdlib'} backend)")
+    if columnar.pa is not None:
+        for fmt in columnar.COLUMNAR_MEDIA_TYPES:
+            bench(f"encode_frame ({fmt})", lambda fmt=fmt: columnar.encode_frame(frame, fmt))
+
+
+if __name__ == "__main__":
+    main()
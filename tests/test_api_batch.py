@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+from app.analytics.ranking import build_ranking_index
+from app.api import batch, routes
+from app.main import app
+from app.storage.repository import replace_metrics
+
+
+async def test_batch_runs_items_in_order_with_dedup_and_errors(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    metrics = pd.DataFrame(
+        [
+            {"company_name": name, "year": 2023, "indicator_name": "roe", "indicator_value": value}
+            for name, value in [("Alpha", 0.1), ("Beta", 0.3)]
+        ]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+    replace_metrics(db_path, metrics, overall, build_ranking_index(metrics))
+
+    calls: list[str] = []
+    original_query = batch.query_metrics
+
+    def _counting_query(*args: object) -> list[dict]:
+        calls.append("query")
+        return original_query(*args)
+
+    monkeypatch.setattr(batch, "query_metrics", _counting_query)
+    payload = {
+        "requests": [
+            {"op": "query", "params": {"company": "Alpha"}},
+            {"op": "rank", "params": {"indicator": "roe", "year": 2023, "n": 1}},
+            {"op": "query", "params": {"year": None, "company": "Alpha"}},
+            {"op": "rank", "params": {"indicator": "roe"}},
+            {"op": "export", "params": {}},
+        ]
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/batch", json=payload)
+
+    items = response.json()["data"]["items"]
+    assert [item["code"] for item in items] == [0, 0, 0, 1001, 1002]
+    assert items[0]["data"]["items"][0]["company_name"] == "Alpha"
+    assert items[1]["data"]["items"][0]["company_name"] == "Beta"
+    assert items[2] == items[0]
+    assert calls == ["query"]
+
+
+async def test_batch_does_not_share_results_between_different_params(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    metrics = pd.DataFrame(
+        [{"company_name": "Alpha", "year": 2023, "indicator_name": "roe", "indicator_value": 0.1}]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+    replace_metrics(db_path, metrics, overall)
+
+    payload = {
+        "requests": [
+            {"op": "query", "params": {"company": " Alpha "}},
+            {"op": "query", "params": {"company": "Alpha"}},
+            {"op": "query", "params": {"company": "Alpha", "year": "2023"}},
+            {"op": "query", "params": {"company": "Alpha", "year": 2023}},
+        ]
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        items = (await client.post("/batch", json=payload)).json()["data"]["items"]
+
+    assert items[0]["data"]["items"] == []
+    assert [row["company_name"] for row in items[1]["data"]["items"]] == ["Alpha"]
+    # "2023" and 2023 validate to the same query, so they share one result.
+    assert items[2] == items[3] and items[2]["data"]["items"]
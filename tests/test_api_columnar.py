@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+from app.api import routes
+from app.main import app
+from app.storage.repository import ingest_facts, replace_metrics
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+async def test_query_and_facts_negotiate_columnar_formats(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    routes.result_cache.clear()
+    metrics = pd.DataFrame(
+        [
+            {"company_name": name, "year": 2023, "indicator_name": "roe", "indicator_value": value}
+            for name, value in [("Alpha", 0.1), ("Beta", 0.3)]
+        ]
+    )
+    replace_metrics(db_path, metrics, pd.DataFrame(columns=["company_name", "year"]))
+    ingest_facts(
+        db_path,
+        pd.DataFrame(
+            [
+                {
+                    "company_name": "Alpha",
+                    "statement_type": "balance_sheet",
+                    "subject_path": path,
+                    "year": 2023,
+                    "amount": amount,
+                }
+                for path, amount in [("资产>流动资产", 10.0), ("资产_其他", 2.0), ("负债", 5.0)]
+            ]
+        ),
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/query",
+            json={"indicator": "roe", "columns": ["company_name", "indicator_value"]},
+            headers={"Accept": "application/vnd.apache.arrow.stream"},
+        )
+        assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.column_names == ["company_name", "indicator_value"]
+        assert table.column("indicator_value").to_pylist() == [0.1, 0.3]
+
+        response = await client.post(
+            "/facts?format=parquet",
+            json={"subject_prefix": "资产>", "columns": ["subject_path", "amount"]},
+        )
+        frame = pq.read_table(pa.BufferReader(response.content)).to_pandas()
+        assert frame.to_dict(orient="records") == [{"subject_path": "资产>流动资产", "amount": 10.0}]
+
+        response = await client.post("/facts", json={"columns": ["company_name"]})
+        assert response.json()["data"]["items"] == [{"company_name": "Alpha"}] * 3
+
+        response = await client.post("/query", json={"columns": ["password"]})
+        assert response.status_code == 400
+        assert response.json()["data"]["details"]["unknown"] == ["password"]
+
+        response = await client.post("/query?format=xml", json={})
+        assert response.status_code == 406
+        assert response.json()["data"]["details"]["supported"] == [
+            "json",
+            "ndjson",
+            "arrow",
+            "parquet",
+        ]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.api import routes
+from app.main import app
+from app.storage.async_repository import get_db_executor, shutdown_db_executor
+
+
+async def test_slow_queries_run_on_bounded_pool_without_blocking_loop(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(routes.settings, "db_path", str(tmp_path / "finance.db"))
+    monkeypatch.setenv("DB_MAX_WORKERS", "2")
+    shutdown_db_executor()
+    assert get_db_executor()._max_workers == 2
+    routes.result_cache.clear()
+
+    release = threading.Event()
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def _blocking_query(*_: object) -> list[dict]:
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        try:
+            release.wait(timeout=5)
+        finally:
+            with lock:
+                running[0] -= 1
+        return []
+
+    monkeypatch.setattr(routes, "query_metrics", _blocking_query)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            queries = [
+                asyncio.create_task(client.post("/query", json={"year": 2020 + i}))
+                for i in range(4)
+            ]
+            for _ in range(500):
+                if running[0] >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            # Both pool threads are now blocked, yet the event loop still answers.
+            probe = await client.get("/")
+            saturated = running[0]
+            release.set()
+            responses = await asyncio.gather(*queries)
+    finally:
+        release.set()
+        shutdown_db_executor()
+
+    assert probe.status_code == 200
+    assert saturated == 2
+    assert running[1] == 2
+    assert all(response.status_code == 200 for response in responses)
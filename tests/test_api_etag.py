@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+from app.api import routes
+from app.core.cache import GenerationTracker
+from app.main import app
+from app.storage.db import SIGNATURE_SETTLE_NS, database_signature
+from app.storage.repository import replace_metrics
+
+
+async def test_conditional_query_returns_304_until_data_changes(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    metrics = pd.DataFrame(
+        [{"company_name": "Alpha", "year": 2023, "indicator_name": "roe", "indicator_value": 0.1}]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+    replace_metrics(db_path, metrics, overall)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.post("/query", json={"company": "Alpha"})
+        etag = first.headers["ETag"]
+
+        routes.result_cache.clear()
+
+        def _fail(*_: object) -> list[dict]:
+            raise AssertionError("metrics should not be queried for a matching ETag")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(routes, "query_metrics", _fail)
+            cached = await client.post(
+                "/query", json={"company": "Alpha"}, headers={"If-None-Match": etag}
+            )
+        other = await client.post(
+            "/query", json={"company": "Beta"}, headers={"If-None-Match": etag}
+        )
+        replace_metrics(db_path, metrics, overall)
+        changed = await client.post(
+            "/query", json={"company": "Alpha"}, headers={"If-None-Match": etag}
+        )
+
+    assert cached.status_code == 304 and cached.headers["ETag"] == etag
+    assert cached.content == b""
+    assert other.status_code == 200
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+async def test_etag_changes_after_database_reset(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = tmp_path / "finance.db"
+    monkeypatch.setattr(routes.settings, "db_path", str(db_path))
+    metrics = pd.DataFrame(
+        [{"company_name": "Alpha", "year": 2023, "indicator_name": "roe", "indicator_value": 0.1}]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        replace_metrics(str(db_path), metrics, overall)
+        first = await client.post("/query", json={"company": "Alpha"})
+        # Same generation number after the rebuild, different data.
+        db_path.unlink()
+        replace_metrics(str(db_path), metrics.assign(indicator_value=0.5), overall)
+        after_reset = await client.post(
+            "/query", json={"company": "Alpha"}, headers={"If-None-Match": first.headers["ETag"]}
+        )
+
+    assert after_reset.status_code == 200
+    assert after_reset.headers["ETag"] != first.headers["ETag"]
+    assert after_reset.json()["data"]["items"][0]["indicator_value"] == 0.5
+
+
+def test_generation_tracker_reuses_value_while_signature_is_stable() -> None:
+    loads: list[int] = []
+    signature: list[object] = ["s1"]
+
+    def load() -> str:
+        loads.append(1)
+        return f"e:{len(loads)}"
+
+    tracker = GenerationTracker(load, max_age_seconds=0, signature=lambda: signature[0])
+    assert tracker.cached() is None
+    assert tracker.refresh() == "e:1"
+    assert tracker.cached() == "e:1"
+    signature[0] = "s2"
+    assert tracker.cached() is None
+    tracker.refresh()
+    signature[0] = None
+    assert tracker.cached() is None and len(loads) == 2
+
+
+def test_database_signature_ignores_recently_written_files(tmp_path: Path) -> None:
+    db_path = tmp_path / "finance.db"
+    assert database_signature(str(db_path)) is None
+    db_path.write_bytes(b"x")
+    assert database_signature(str(db_path)) is None
+    settled = time.time_ns() - 2 * SIGNATURE_SETTLE_NS
+    os.utime(db_path, ns=(settled, settled))
+    assert database_signature(str(db_path)) is not None
+
+
+async def test_conditional_query_skips_sqlite_when_file_unchanged(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = tmp_path / "finance.db"
+    monkeypatch.setattr(routes.settings, "db_path", str(db_path))
+    metrics = pd.DataFrame(
+        [{"company_name": "Alpha", "year": 2023, "indicator_name": "roe", "indicator_value": 0.1}]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+    replace_metrics(str(db_path), metrics, overall)
+    # Age the file past the settle window so its stat can be trusted.
+    settled = time.time_ns() - 2 * SIGNATURE_SETTLE_NS
+    os.utime(db_path, ns=(settled, settled))
+
+    def _no_sqlite(*_: object) -> str:
+        raise AssertionError("a conditional request should not open SQLite")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.post("/query", json={"company": "Alpha"})
+        etag = first.headers["ETag"]
+        with monkeypatch.context() as patch:
+            patch.setattr(routes, "fetch_data_generation", _no_sqlite)
+            patch.setattr(routes, "query_metrics", _no_sqlite)
+            cached = await client.post(
+                "/query", json={"company": "Alpha"}, headers={"If-None-Match": etag}
+            )
+        replace_metrics(str(db_path), metrics.assign(indicator_value=0.2), overall)
+        changed = await client.post(
+            "/query", json={"company": "Alpha"}, headers={"If-None-Match": etag}
+        )
+
+    assert cached.status_code == 304
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
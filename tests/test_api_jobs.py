@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+from app.api import routes
+from app.jobs import manager as manager_module
+from app.jobs.manager import JobManager
+from app.main import app
+from app.storage.repository import fetch_facts_df
+
+
+async def _wait(client: httpx.AsyncClient, job_id: str) -> dict[str, Any]:
+    for _ in range(600):
+        job = (await client.get(f"/jobs/{job_id}")).json()["data"]
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def _crash_or_succeed(
+    job_id: str, kind: str, db_path: str, job_dir: str, params: dict[str, Any]
+) -> dict[str, Any]:
+    if params.get("crash"):
+        os._exit(1)
+    return {"job_id": job_id}
+
+
+async def test_crashed_worker_does_not_wedge_later_jobs(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    # Module-level so the worker process can unpickle it by reference.
+    monkeypatch.setattr(manager_module, "_execute", _crash_or_succeed)
+    manager = JobManager(max_workers=1)
+    monkeypatch.setattr(routes, "job_manager", manager)
+    output_dir = str(tmp_path / "output")
+    try:
+        crashed = manager.submit("export_html", {"crash": True}, "unused.db", output_dir)
+        queued = manager.submit("export_html", {}, "unused.db", output_dir)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            crashed_job = await _wait(client, crashed.job_id)
+            queued_job = await _wait(client, queued.job_id)
+            later = manager.submit("export_html", {}, "unused.db", output_dir)
+            later_job = await _wait(client, later.job_id)
+    finally:
+        manager.shutdown()
+
+    assert crashed_job["status"] == "failed"
+    assert queued_job["status"] == "succeeded", queued_job["error"]
+    assert later_job["status"] == "succeeded", later_job["error"]
+    assert sum(manager._running.values()) == 0
+
+
+async def test_jobs_run_pipeline_and_serve_artifacts(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, demo_input_dir: Path
+) -> None:
+    monkeypatch.setenv("INPUT_DIR", str(demo_input_dir))
+    monkeypatch.setattr(routes.settings, "db_path", str(tmp_path / "finance.db"))
+    monkeypatch.setattr(routes.settings, "output_dir", str(tmp_path / "output"))
+    manager = JobManager(max_workers=2, kind_limits={"export_excel": 1})
+    monkeypatch.setattr(routes, "job_manager", manager)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/jobs/ingest", json={"params": {"reset": True}})
+            assert response.json()["data"]["status"] == "running"
+            ingest = await _wait(client, response.json()["data"]["job_id"])
+            assert ingest["status"] == "succeeded"
+            assert ingest["result"]["ingested_rows"] > 0
+
+            response = await client.post("/jobs/calc", json={})
+            calc = await _wait(client, response.json()["data"]["job_id"])
+            assert calc["status"] == "succeeded", calc["error"]
+            assert calc["progress"] == 1.0
+            for _ in range(100):
+                calc = (await client.get(f"/jobs/{calc['job_id']}")).json()["data"]
+                if calc["stages"]:
+                    break
+                await asyncio.sleep(0.05)
+            assert {"calc.indicators", "calc.scoring", "calc.overall"} <= set(calc["stages"])
+
+            submitted = [
+                (await client.post("/jobs/export_excel", json={"params": {"year": 2023}}))
+                .json()["data"]
+                for _ in range(2)
+            ]
+            assert [job["status"] for job in submitted] == ["running", "queued"]
+            exports = [await _wait(client, job["job_id"]) for job in submitted]
+            assert [job["status"] for job in exports] == ["succeeded", "succeeded"]
+            assert exports[1]["started_at"] >= exports[0]["finished_at"]
+
+            artifact = await client.get(f"/jobs/{exports[0]['job_id']}/artifact")
+            assert artifact.status_code == 200
+            assert artifact.content[:2] == b"PK"
+
+            assert (await client.post("/jobs/unknown", json={})).status_code == 404
+            bad = await client.post("/jobs/export_ppt", json={"params": {}})
+            assert bad.json()["code"] == 1001
+            assert (await client.get(f"/jobs/{ingest['job_id']}/artifact")).status_code == 409
+    finally:
+        manager.shutdown()
+
+
+async def test_writer_jobs_are_serialized_and_reset_is_exclusive(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, demo_input_dir: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setenv("INPUT_DIR", str(demo_input_dir))
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    monkeypatch.setattr(routes.settings, "output_dir", str(tmp_path / "output"))
+    manager = JobManager(max_workers=2)
+    monkeypatch.setattr(routes, "job_manager", manager)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            ingest = (await client.post("/jobs/ingest", json={})).json()["data"]
+            calc = (await client.post("/jobs/calc", json={})).json()["data"]
+            assert [ingest["status"], calc["status"]] == ["running", "queued"]
+            rejected = await client.post("/jobs/ingest", json={"params": {"reset": True}})
+            assert rejected.status_code == 409
+            ingest, calc = [await _wait(client, job["job_id"]) for job in (ingest, calc)]
+            assert calc["status"] == "succeeded", calc["error"]
+            assert calc["started_at"] >= ingest["finished_at"]
+
+            reset = (await client.post("/jobs/ingest", json={"params": {"reset": True}})).json()
+            export = (
+                await client.post("/jobs/export_html", json={"params": {"year": 2023}})
+            ).json()["data"]
+            assert reset["data"]["status"] == "running" and export["status"] == "queued"
+            reset = await _wait(client, reset["data"]["job_id"])
+            export = await _wait(client, export["job_id"])
+            assert reset["status"] == "succeeded", reset["error"]
+            assert export["started_at"] >= reset["finished_at"]
+    finally:
+        manager.shutdown()
+
+    # The reset replaced the facts in place instead of appending a second copy.
+    assert len(fetch_facts_df(db_path)) == ingest["result"]["ingested_rows"]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+from app.api import routes
+from app.main import app
+from app.storage.repository import ingest_facts, replace_metrics
+
+
+async def test_query_and_drilldown_stream_ndjson(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    metrics = pd.DataFrame(
+        [
+            {"company_name": f"C{idx}", "year": 2023, "indicator_name": "roe", "indicator_value": idx}
+            for idx in range(2500)
+        ]
+    )
+    overall = pd.DataFrame([{"company_name": "C0", "year": 2023, "overall_risk_score": 10}])
+    replace_metrics(db_path, metrics, overall)
+    facts = pd.DataFrame(
+        [
+            {
+                "company_name": "Alpha",
+                "statement_type": "balance_sheet",
+                "category": "资产",
+                "subject_path": path,
+                "subject_l1": "资产",
+                "subject_l2": "",
+                "subject_l3": "",
+                "year": 2023,
+                "amount": 1.0,
+            }
+            for path in ["资产>流动资产>货币资金", "资产>流动资产%", "资产>非流动资产"]
+        ]
+    )
+    ingest_facts(db_path, facts)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        query = await client.post("/query?stream=1", json={"indicator": "roe"})
+        drill = await client.post(
+            "/drilldown",
+            json={
+                "company": "Alpha",
+                "year": 2023,
+                "statement_type": "balance_sheet",
+                "subject_prefix": "资产>流动资产>",
+            },
+            headers={"Accept": "application/x-ndjson"},
+        )
+        drill_json = await client.post(
+            "/drilldown",
+            json={
+                "company": "Alpha",
+                "year": 2023,
+                "statement_type": "balance_sheet",
+                "subject_prefix": "资产>流动资产>",
+            },
+        )
+
+    assert query.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in query.text.splitlines()]
+    assert len(lines) == 2501
+    assert lines[-1]["code"] == 0 and lines[-1]["data"]["count"] == 2500
+    assert lines[-1]["trace_id"] == query.headers["X-Trace-Id"]
+
+    drill_lines = [json.loads(line) for line in drill.text.splitlines()]
+    assert [row["subject_path"] for row in drill_lines[:-1]] == ["资产>流动资产>货币资金"]
+    assert drill_lines[-1]["data"]["count"] == 1
+    assert [row["subject_path"] for row in drill_json.json()["data"]["items"]] == [
+        "资产>流动资产>货币资金"
+    ]
+
+
+async def test_stream_rejects_unknown_columns_before_streaming(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(routes.settings, "db_path", str(tmp_path / "finance.db"))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = [
+            await client.post(f"{path}?stream=1", json={"columns": ["nope"]})
+            for path in ("/query", "/facts")
+        ]
+
+    for response in responses:
+        assert response.status_code == 400
+        assert response.headers["content-type"].startswith("application/json")
+        assert response.json()["code"] == 1001
+        assert response.json()["data"]["details"]["unknown"] == ["nope"]
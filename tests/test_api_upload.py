@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+from app.api import routes
+from app.jobs.manager import JobManager
+from app.main import app
+from app.storage.repository import fetch_companies
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+async def test_upload_spools_validates_and_ingests_in_background(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, demo_input_dir: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    monkeypatch.setattr(routes.settings, "output_dir", str(tmp_path / "output"))
+    manager = JobManager(max_workers=2, kind_limits={"ingest_upload": 2})
+    monkeypatch.setattr(routes, "job_manager", manager)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/ingest/upload",
+                        files=[("files", (path.name, path.read_bytes(), XLSX))],
+                    )
+                    for path in sorted(demo_input_dir.glob("*.xlsx"))
+                )
+            )
+            jobs = [response.json()["data"] for response in responses]
+            assert [job["files"][0]["company_name"] for job in jobs] == ["Alpha", "Beta"]
+            # Both uploads parse at once; only their inserts take the shared write lock.
+            assert [job["status"] for job in jobs] == ["running", "running"]
+
+            finished = []
+            for job in jobs:
+                for _ in range(600):
+                    status = (await client.get(f"/jobs/{job['job_id']}")).json()["data"]
+                    if status["status"] not in ("queued", "running"):
+                        break
+                    await asyncio.sleep(0.05)
+                assert status["status"] == "succeeded", status["error"]
+                assert not (tmp_path / "output" / "jobs" / job["job_id"] / "upload").exists()
+                finished.append(status)
+            first, second = sorted(finished, key=lambda status: status["started_at"])
+            assert second["started_at"] < first["finished_at"]
+            assert all("ingest.parse" in status["stages"] for status in finished)
+            assert sorted(fetch_companies(db_path)) == ["Alpha", "Beta"]
+
+            bad_sheet = tmp_path / "Gamma.xlsx"
+            pd.DataFrame({"a": [1]}).to_excel(bad_sheet, index=False)
+            response = await client.post(
+                "/ingest/upload", files=[("files", (bad_sheet.name, bad_sheet.read_bytes(), XLSX))]
+            )
+            assert response.status_code == 400
+            assert response.json()["code"] == 1005
+            assert response.json()["data"]["details"]["file"] == "Gamma.xlsx"
+            assert not list((tmp_path / "output" / "jobs").glob("*/upload"))
+
+            response = await client.post(
+                "/ingest/upload", files=[("files", ("notes.csv", b"a,b\n", "text/csv"))]
+            )
+            assert response.json()["code"] == 1002
+    finally:
+        manager.shutdown()
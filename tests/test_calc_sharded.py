@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from app.analytics.pipeline import partition_companies, run_calc_pipeline, run_sharded_calc
+from app.ingest.excel_reader import read_company_excel
+from app.ingest.normalizer import normalize_statement
+from app.storage.repository import fetch_facts_df, ingest_facts
+
+WEIGHTS = {"net_profit_margin": 0.4, "current_ratio": 0.3, "roe": 0.3}
+
+
+def test_sharded_calc_matches_single_core(demo_input_dir: Path, tmp_path: Path) -> None:
+    db_path = str(tmp_path / "finance.db")
+    for excel_file in sorted(demo_input_dir.glob("*.xlsx")):
+        sheets = read_company_excel(excel_file)
+        facts = [normalize_statement(excel_file.stem, st, df) for st, df in sheets.items()]
+        ingest_facts(db_path, pd.concat(facts, ignore_index=True))
+
+    single = run_calc_pipeline(fetch_facts_df(db_path), "warn", WEIGHTS)
+    sharded = run_sharded_calc(db_path, "warn", WEIGHTS, workers=2)
+
+    keys = ["company_name", "year", "indicator_name"]
+    pd.testing.assert_frame_equal(
+        single.metrics.sort_values(keys).reset_index(drop=True),
+        sharded.metrics.sort_values(keys).reset_index(drop=True),
+    )
+    pd.testing.assert_frame_equal(
+        single.overall.sort_values(["company_name", "year"]).reset_index(drop=True),
+        sharded.overall.sort_values(["company_name", "year"]).reset_index(drop=True),
+    )
+    assert partition_companies(["A", "B", "C"], 8) == [["A"], ["B"], ["C"]]
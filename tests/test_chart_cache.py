@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.reporting import charts
+from app.reporting.charts import ChartCache, ChartSpec, render_charts
+
+
+def _metrics(alpha_margin: float) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "company_name": company,
+                "year": 2023,
+                "indicator_name": "net_profit_margin",
+                "indicator_value": value,
+                "risk_score": 10,
+            }
+            for company, value in [("Alpha", alpha_margin), ("Beta", 0.2)]
+        ]
+    )
+
+
+def _specs(metrics: pd.DataFrame, assets_dir: Path) -> list[ChartSpec]:
+    options = {"indicator": "net_profit_margin", "year": 2023}
+    return [
+        ChartSpec("bar", metrics, assets_dir / f"{company}_bar.png", options)
+        for company in ("Alpha", "Beta")
+    ]
+
+
+@pytest.fixture
+def rendered(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    calls: list[Path] = []
+    original = charts.render_chart
+
+    def counting(spec: ChartSpec) -> Path:
+        calls.append(spec.output_path)
+        return original(spec)
+
+    monkeypatch.setattr(charts, "render_chart", counting)
+    return calls
+
+
+def test_chart_cache_skips_unchanged_charts(tmp_path: Path, rendered: list[Path]) -> None:
+    cache = ChartCache(tmp_path / "cache", 10 * 1024 * 1024)
+
+    first = render_charts(_specs(_metrics(0.1), tmp_path / "run1"), cache=cache)
+    assert len(rendered) == 1
+    assert all(path.exists() for path in first)
+    assert len(list(cache.directory.glob("*.png"))) == 1
+
+    second = render_charts(_specs(_metrics(0.1), tmp_path / "run2"), cache=cache)
+    assert len(rendered) == 1
+    assert [path.read_bytes() for path in second] == [path.read_bytes() for path in first]
+
+    render_charts(_specs(_metrics(0.3), tmp_path / "run3"), cache=cache)
+    assert len(rendered) == 2
+    assert len(list(cache.directory.glob("*.png"))) == 2
+
+
+def test_chart_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ChartCache(tmp_path / "cache", 0)
+    cache.directory.mkdir()
+    for age, key in enumerate(["old", "mid", "new"]):
+        path = cache.path(key)
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (1000 + age, 1000 + age))
+    cache.max_bytes = 15
+
+    assert cache.get("old") is not None
+    assert cache.evict() == 2
+    assert [path.stem for path in cache.directory.glob("*.png")] == ["old"]
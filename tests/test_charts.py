@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.reporting.charts import ChartSpec, render_chart
+
+
+def _metrics() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "company_name": company,
+                "year": year,
+                "indicator_name": indicator,
+                "indicator_value": value * (year - 2020),
+                "risk_score": value * 100,
+            }
+            for company, value in [("Alpha", 0.1), ("Beta", 0.2)]
+            for year in (2022, 2023)
+            for indicator in ("net_profit_margin", "roe")
+        ]
+    )
+
+
+def _specs(directory: Path, suffix: str = ".png") -> list[ChartSpec]:
+    metrics = _metrics()
+    return [
+        ChartSpec(
+            "trend",
+            metrics,
+            directory / f"trend{suffix}",
+            {"company": "Alpha", "indicators": ["net_profit_margin", "roe"]},
+        ),
+        ChartSpec(
+            "bar",
+            metrics,
+            directory / f"bar{suffix}",
+            {"indicator": "roe", "year": 2023},
+        ),
+        ChartSpec("heatmap", metrics, directory / f"heatmap{suffix}", {"year": 2023}),
+    ]
+
+
+def test_render_chart_is_thread_safe(tmp_path: Path) -> None:
+    serial = [render_chart(spec).read_bytes() for spec in _specs(tmp_path / "serial")]
+    specs = [spec for run in range(4) for spec in _specs(tmp_path / f"thread{run}")]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        threaded = [path.read_bytes() for path in executor.map(render_chart, specs)]
+    assert threaded == serial * 4
+
+
+def test_render_chart_writes_svg_and_rejects_unknown_formats(tmp_path: Path) -> None:
+    for spec in _specs(tmp_path, ".svg"):
+        assert b"<svg" in render_chart(spec).read_bytes()[:500]
+    with pytest.raises(ValueError):
+        render_chart(_specs(tmp_path, ".emf")[0])
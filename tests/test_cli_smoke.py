@@ -41,3 +41,41 @@ def test_cli_pipeline(demo_input_dir: Path, tmp_path: Path) -> None:
         ]
     )
     assert calc["code"] == 0
+
+    drilldown = _run(
+        [
+            "python",
+            "-m",
+            "app.cli",
+            "drilldown",
+            "--db-path",
+            str(db_path),
+            "--company",
+            "Alpha",
+            "--year",
+            "2023",
+            "--statement-type",
+            "balance_sheet",
+            "--subject-prefix",
+            "资产",
+            "--json",
+        ]
+    )
+    assert drilldown["code"] == 0
+
+    bundle = _run(
+        [
+            "python",
+            "-m",
+            "app.cli",
+            "export_excel",
+            "--db-path",
+            str(db_path),
+            "--year",
+            "2023",
+            "--bundle-dir",
+            str(tmp_path / "workbooks"),
+            "--json",
+        ]
+    )
+    assert bundle["data"]["files"] == 2
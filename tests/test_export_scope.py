@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+from app.services import calc_command, export_excel_command, export_html_command, ingest_command
+from app.storage.repository import fetch_metrics_df, fetch_overall_df
+
+
+def test_exports_read_only_the_requested_scope(demo_input_dir: Path, tmp_path: Path) -> None:
+    db_path = str(tmp_path / "finance.db")
+    ingest_command(str(demo_input_dir), db_path, reset=False)
+    calc_command(db_path, "warn")
+
+    scoped = fetch_metrics_df(db_path, companies=["Alpha"], years=[2023], indicators=["roe"])
+    assert scoped[["company_name", "year", "indicator_name"]].drop_duplicates().values.tolist() == [
+        ["Alpha", 2023, "roe"]
+    ]
+    assert set(fetch_overall_df(db_path, years=[2022])["year"]) == {2022}
+
+    html = export_html_command(
+        db_path,
+        str(tmp_path / "report.html"),
+        "net_profit_margin",
+        2023,
+        5,
+        companies=["Beta"],
+        years=[2023],
+    )
+    document = Path(html["path"]).read_text(encoding="utf-8")
+    payload = json.loads(re.search(r'id="report-data">(.*?)</script>', document, re.S).group(1))
+    assert {tuple(row[:2]) for row in payload["metrics"]["rows"]} == {("Beta", 2023)}
+    # Without --indicators only the base ratios are shown, not the derived yoy/cagr/avg series.
+    assert {row[2] for row in payload["metrics"]["rows"]} == {
+        "net_profit_margin",
+        "current_ratio",
+        "roe",
+    }
+    assert [row[0] for row in payload["ranking"]["rows"]] == ["Beta"]
+
+    excel = export_excel_command(
+        db_path,
+        str(tmp_path / "report.xlsx"),
+        "net_profit_margin",
+        2023,
+        5,
+        None,
+        None,
+        None,
+        companies=["Alpha"],
+        indicators=["roe", "current_ratio"],
+    )
+    sheet = load_workbook(excel["path"])["指标表"]
+    rows = list(sheet.iter_rows(min_row=2, values_only=True))
+    assert rows and {row[0] for row in rows} == {"Alpha"}
+    assert {row[2] for row in rows} == {"roe", "current_ratio"}
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import threading
 from pathlib import Path
 
 import pandas as pd
+import pytest
 
+from app import services
 from app.ingest.excel_reader import read_company_excel
 from app.ingest.normalizer import normalize_statement
 from app.storage.repository import ingest_facts
@@ -23,3 +26,20 @@ def test_ingest_normalization(demo_input_dir: Path, tmp_path: Path) -> None:
     db_path = tmp_path / "finance.db"
     total = ingest_facts(str(db_path), facts_df)
     assert total == len(facts_df)
+
+
+def test_ingest_command_writes_under_the_write_lock(
+    monkeypatch: pytest.MonkeyPatch, demo_input_dir: Path, tmp_path: Path
+) -> None:
+    lock = threading.Lock()
+    held: list[bool] = []
+
+    def _ingest(db_path: str, facts: pd.DataFrame, reset: bool = False) -> int:
+        held.append(lock.locked())
+        return ingest_facts(db_path, facts, reset=reset)
+
+    monkeypatch.setattr(services, "ingest_facts", _ingest)
+    services.ingest_command(
+        str(demo_input_dir), str(tmp_path / "finance.db"), reset=False, write_lock=lock
+    )
+    assert held == [True] and not lock.locked()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.api import routes
+from app.core.metrics import Registry
+from app.main import app
+from app.services import calc_command, ingest_command
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, route="/a")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a\\"b"} 3.0' in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2.0' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3.0' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4.0' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.65' in lines
+    assert 'latency_seconds_count{route="/a"} 4.0' in lines
+
+
+async def test_metrics_endpoint_reports_routes_db_cache_and_stages(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, demo_input_dir: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    routes.result_cache.clear()
+    ingest_command(str(demo_input_dir), db_path, reset=False)
+    calc_command(db_path, "warn")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/query", json={"company": "Alpha"})
+        await client.post("/query", json={"company": "Alpha"})
+        response = await client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_requests_total{method="POST",route="/query",status="200"}' in text
+    assert 'db_query_duration_seconds_count{operation="query_metrics"}' in text
+    assert 'dataframe_build_duration_seconds_count{operation="fetch_facts_df"}' in text
+    for pipeline, stage in [
+        ("ingest", "parse"),
+        ("ingest", "normalize"),
+        ("ingest", "write"),
+        ("calc", "indicators"),
+        ("calc", "scoring"),
+        ("calc", "overall"),
+    ]:
+        assert f'stage_duration_seconds_count{{pipeline="{pipeline}",stage="{stage}"}}' in text
+    assert "result_cache_hits_total" in text
+    assert 'jobs{status="running"}' in text
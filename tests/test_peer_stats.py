@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from app.analytics.peer_stats import ALL_PEER_GROUP, calculate_peer_stats
+
+
+def test_peer_percentiles_and_distribution() -> None:
+    metrics = pd.DataFrame(
+        [
+            {"company_name": name, "year": 2023, "indicator_name": "roe", "indicator_value": value}
+            for name, value in [("A", 0.1), ("B", 0.2), ("C", 0.3), ("D", 0.4), ("E", 0.5)]
+        ]
+    )
+    profiles = pd.DataFrame(
+        [
+            {"company_name": "A", "industry": "制造", "size_bucket": "大型"},
+            {"company_name": "B", "industry": "制造", "size_bucket": "大型"},
+            {"company_name": "C", "industry": "能源", "size_bucket": None},
+            {"company_name": "D", "industry": None, "size_bucket": "能源"},
+            {"company_name": "E", "industry": None, "size_bucket": None},
+        ]
+    )
+
+    result = calculate_peer_stats(metrics, profiles)
+    groups = dict(zip(result.percentiles["company_name"], result.percentiles["peer_group"], strict=False))
+    assert groups == {
+        "A": "制造/大型",
+        "B": "制造/大型",
+        "C": "能源/",
+        "D": "/能源",
+        "E": "unassigned",
+    }
+    percentile = result.percentiles.set_index("company_name")["peer_percentile"]
+    assert percentile["A"] == 0.5 and percentile["B"] == 1.0
+    assert percentile["C"] == 1.0 and percentile["D"] == 1.0
+
+    universe = result.distribution[result.distribution["peer_group"] == ALL_PEER_GROUP].iloc[0]
+    assert universe["count"] == 5
+    assert round(universe["p50"], 2) == 0.3
@@ -4,8 +4,8 @@ from pathlib import Path
 
 import pandas as pd
 
-from app.analytics.ranking import top_n_companies
-from app.storage.repository import ingest_facts, query_metrics, replace_metrics
+from app.analytics.ranking import build_ranking_index, top_n_companies
+from app.storage.repository import ingest_facts, query_metrics, query_ranking, replace_metrics
 
 
 def test_query_and_rank(tmp_path: Path) -> None:
@@ -62,3 +62,60 @@ def test_query_and_rank(tmp_path: Path) -> None:
 
     ranking = top_n_companies(metrics, "net_profit_margin", 2023, n=1)
     assert ranking.iloc[0]["company_name"] == "Alpha"
+
+
+def test_ranking_index(tmp_path: Path) -> None:
+    metrics = pd.DataFrame(
+        [
+            {
+                "company_name": name,
+                "year": 2023,
+                "indicator_name": "roe",
+                "indicator_value": value,
+                "risk_level": "low",
+                "risk_score": 10,
+                "details": "{}",
+            }
+            for name, value in [("Alpha", 0.1), ("Beta", 0.3), ("Gamma", 0.3), ("Delta", None)]
+        ]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+    db_path = str(tmp_path / "finance.db")
+    replace_metrics(db_path, metrics, overall, build_ranking_index(metrics))
+
+    top = query_ranking(db_path, "roe", 2023, n=2)
+    assert top["company_name"].tolist() == ["Beta", "Gamma"]
+    assert top["dense_rank"].tolist() == [1, 1]
+    bottom = query_ranking(db_path, "roe", 2023, n=1, order="asc")
+    assert bottom.iloc[0]["company_name"] == "Alpha"
+    assert bottom.iloc[0]["ordinal_rank"] == 3
+
+
+def test_ranking_ties_keep_company_order_in_both_directions(tmp_path: Path) -> None:
+    metrics = pd.DataFrame(
+        [
+            {
+                "company_name": name,
+                "year": 2023,
+                "indicator_name": "roe",
+                "indicator_value": value,
+                "risk_level": "low",
+                "risk_score": 10,
+                "details": "{}",
+            }
+            for name, value in [("Alpha", 0.1), ("Beta", 0.1), ("Gamma", 0.1), ("Delta", 0.3)]
+        ]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+    indexed = str(tmp_path / "indexed.db")
+    replace_metrics(indexed, metrics, overall, build_ranking_index(metrics))
+    fallback = str(tmp_path / "fallback.db")
+    replace_metrics(fallback, metrics, overall)
+
+    for order, expected in [("asc", ["Alpha", "Beta"]), ("desc", ["Delta", "Alpha"])]:
+        assert top_n_companies(metrics, "roe", 2023, n=2, order=order)[
+            "company_name"
+        ].tolist() == expected
+        for db_path in (indexed, fallback):
+            ranking = query_ranking(db_path, "roe", 2023, n=2, order=order)
+            assert ranking["company_name"].tolist() == expected
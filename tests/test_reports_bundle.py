@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+from pptx import Presentation
+
+from app.services import calc_command, export_excel_command, export_ppt_command, ingest_command
+
+
+def test_export_bundles_one_report_per_company(demo_input_dir: Path, tmp_path: Path) -> None:
+    db_path = str(tmp_path / "finance.db")
+    ingest_command(str(demo_input_dir), db_path, reset=False)
+    calc_command(db_path, "warn")
+    template = tmp_path / "template.pptx"
+    Presentation().save(template)
+
+    ppt = export_ppt_command(
+        db_path,
+        str(tmp_path / "unused.pptx"),
+        str(tmp_path / "assets"),
+        str(template),
+        "net_profit_margin",
+        2023,
+        5,
+        workers=2,
+        bundle_dir=str(tmp_path / "decks"),
+        zip_bundle=True,
+    )
+    assert ppt == {"path": str(tmp_path / "decks.zip"), "files": 2}
+    with zipfile.ZipFile(ppt["path"]) as archive:
+        assert sorted(archive.namelist()) == ["Alpha.pptx", "Beta.pptx"]
+    deck = Presentation(tmp_path / "decks" / "Alpha.pptx")
+    assert len(deck.slides) == 2
+    assert "Beta" not in deck.slides[0].shapes.title.text
+
+    excel = export_excel_command(
+        db_path,
+        str(tmp_path / "unused.xlsx"),
+        "net_profit_margin",
+        2023,
+        5,
+        None,
+        None,
+        None,
+        bundle_dir=str(tmp_path / "workbooks"),
+    )
+    assert excel == {"path": str(tmp_path / "workbooks"), "files": 2}
+    assert sorted(path.name for path in (tmp_path / "workbooks").iterdir()) == [
+        "Alpha.xlsx",
+        "Beta.xlsx",
+    ]
@@ -3,6 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 
 import pandas as pd
+from openpyxl import load_workbook
 
 from app.reporting.excel_report import export_excel_report
 
@@ -24,3 +25,31 @@ def test_export_excel(tmp_path: Path) -> None:
     output_path = tmp_path / "report.xlsx"
     export_excel_report(metrics, ranking, None, output_path)
     assert output_path.exists()
+
+
+def test_export_excel_streams_chunks_into_split_sheets(tmp_path: Path) -> None:
+    chunks = [
+        pd.DataFrame(
+            {
+                "company_name": [f"C{start + offset}" for offset in range(3)],
+                "year": 2023,
+                "indicator_name": "roe",
+                "indicator_value": [0.1, None, 0.3],
+                "risk_level": ["low", "medium", "high"],
+            }
+        )
+        for start in (0, 3)
+    ]
+    output_path = tmp_path / "report.xlsx"
+    export_excel_report(iter(chunks), chunks[0].head(1), None, output_path, max_rows=4)
+
+    workbook = load_workbook(output_path)
+    assert workbook.sheetnames == ["指标表", "指标表_2", "排名表"]
+    first, second = workbook["指标表"], workbook["指标表_2"]
+    assert first.max_row == 5 and second.max_row == 3
+    assert [cell.value for cell in second[1]][:2] == ["company_name", "year"]
+    assert second["A3"].value == "C5" and first["D3"].value is None
+    # Risk colors are sheet-level rules, not per-cell fills.
+    assert first["E2"].fill.fill_type is None
+    rules = [rule for cf in first.conditional_formatting for rule in cf.rules]
+    assert sorted(rule.formula[0] for rule in rules) == ['"high"', '"low"', '"medium"']
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from app.reporting.html_report import export_html_report
+
+
+def test_export_html_embeds_report_data(tmp_path: Path) -> None:
+    metrics = pd.DataFrame(
+        [
+            {
+                "company_name": company,
+                "year": year,
+                "indicator_name": "net_profit_margin",
+                "indicator_value": value,
+                "risk_level": "low",
+                "risk_score": 10.0,
+                "details": "{}",
+            }
+            for company, value in [("Alpha", 0.2), ("</script>Beta", None)]
+            for year in (2022, 2023)
+        ]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 20.0}])
+    ranking = metrics[(metrics["year"] == 2023) & metrics["indicator_value"].notna()]
+
+    output_path = export_html_report(
+        metrics, overall, ranking, "net_profit_margin", 2023, tmp_path / "report.html"
+    )
+
+    document = output_path.read_text(encoding="utf-8")
+    assert document.count("</script>") == 2
+    match = re.search(r'id="report-data">(.*?)</script>', document, re.S)
+    payload = json.loads(match.group(1))
+    assert payload["year"] == 2023
+    assert payload["metrics"]["columns"] == [
+        "company_name",
+        "year",
+        "indicator_name",
+        "indicator_value",
+        "risk_level",
+        "risk_score",
+    ]
+    assert payload["metrics"]["rows"][3] == [
+        "</script>Beta",
+        2023,
+        "net_profit_margin",
+        None,
+        "low",
+        10.0,
+    ]
+    assert payload["ranking"] == {
+        "columns": ["company_name", "indicator_value"],
+        "rows": [["Alpha", 0.2]],
+    }
@@ -3,9 +3,13 @@ from __future__ import annotations
 from pathlib import Path
 
 import pandas as pd
+import pytest
 from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
 
-from app.reporting.ppt_report import export_ppt_report
+from app.reporting import ppt_report
+from app.reporting.ppt_report import _parsed_template, export_ppt_report
+from app.reporting.template_generator import ensure_template
 
 
 def test_export_ppt(tmp_path: Path) -> None:
@@ -51,3 +55,146 @@ def test_export_ppt(tmp_path: Path) -> None:
     assert output_path.exists()
     presentation = Presentation(output_path)
     assert len(presentation.slides) >= 2
+
+
+def test_export_ppt_renders_charts_in_worker_processes(tmp_path: Path) -> None:
+    metrics = pd.DataFrame(
+        [
+            {
+                "company_name": company,
+                "year": year,
+                "indicator_name": indicator,
+                "indicator_value": value + year - 2022,
+                "risk_level": "low",
+                "risk_score": 10,
+            }
+            for company, value in [("Alpha", 0.1), ("Beta", 0.2), ("Gamma", 0.3)]
+            for year in (2022, 2023)
+            for indicator in ("net_profit_margin", "current_ratio", "roe")
+        ]
+    )
+    overall = pd.DataFrame(
+        [
+            {"company_name": name, "year": 2023, "overall_risk_score": 20}
+            for name in ("Alpha", "Beta", "Gamma")
+        ]
+    )
+    ranking = metrics[
+        (metrics["indicator_name"] == "net_profit_margin") & (metrics["year"] == 2023)
+    ]
+    assets_dir = tmp_path / "assets"
+
+    output_path = export_ppt_report(
+        metrics,
+        overall,
+        tmp_path / "report.pptx",
+        assets_dir,
+        tmp_path / "missing.pptx",
+        ranking,
+        chart_workers=3,
+    )
+
+    # One trend per company plus a single bar chart shared by the common latest year.
+    assert sorted(path.name for path in assets_dir.glob("*.png")) == [
+        "Alpha_trend.png",
+        "Beta_trend.png",
+        "Gamma_trend.png",
+        "net_profit_margin_2023_bar.png",
+    ]
+    presentation = Presentation(output_path)
+    assert len(presentation.slides) == 6
+    pictures = [
+        shape
+        for slide in presentation.slides
+        for shape in slide.shapes
+        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE
+    ]
+    assert len(pictures) == 6
+
+
+def test_export_ppt_parses_template_once(tmp_path: Path) -> None:
+    metrics = pd.DataFrame(
+        [
+            {
+                "company_name": "Alpha",
+                "year": 2023,
+                "indicator_name": "net_profit_margin",
+                "indicator_value": 0.2,
+                "risk_level": "low",
+                "risk_score": 10,
+            }
+        ]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 20}])
+    # The generated minimal template only has one layout; slides fall back to it.
+    template = ensure_template(tmp_path / "template.pptx")
+    _parsed_template.cache_clear()
+
+    for name in ("first.pptx", "second.pptx"):
+        export_ppt_report(
+            metrics, overall, tmp_path / name, tmp_path / "assets", template, metrics
+        )
+
+    assert _parsed_template.cache_info().misses == 1
+    first, second = Presentation(tmp_path / "first.pptx"), Presentation(tmp_path / "second.pptx")
+    assert len(first.slides) == len(second.slides) == 3
+    assert len(Presentation(template).slides) == 1
+
+
+def test_export_ppt_incremental_rebuilds_only_changed_companies(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    metrics = pd.DataFrame(
+        [
+            {
+                "company_name": company,
+                "year": 2023,
+                "indicator_name": indicator,
+                "indicator_value": value,
+                "risk_level": "low",
+                "risk_score": 10,
+            }
+            for company, value in [("Alpha", 0.1), ("Beta", 0.2)]
+            for indicator in ("net_profit_margin", "roe")
+        ]
+    )
+    overall = pd.DataFrame(
+        [
+            {"company_name": name, "year": 2023, "overall_risk_score": 20}
+            for name in ("Alpha", "Beta")
+        ]
+    )
+    ranking = metrics[metrics["indicator_name"] == "net_profit_margin"]
+    output_path = tmp_path / "report.pptx"
+    template = tmp_path / "missing.pptx"
+
+    def export(frame: pd.DataFrame) -> list[str]:
+        export_ppt_report(
+            frame, overall, output_path, tmp_path / "assets", template, ranking, incremental=True
+        )
+        return [slide.name for slide in Presentation(output_path).slides]
+
+    first = export(metrics)
+    assert [name.rsplit(":", 1)[1] for name in first] == ["Alpha", "Alpha", "Beta", "Beta"]
+
+    rendered: list[str] = []
+    original = ppt_report.render_charts
+
+    def counting(specs: list, **kwargs: object) -> list:
+        rendered.extend(spec.output_path.name for spec in specs)
+        return original(specs, **kwargs)
+
+    monkeypatch.setattr(ppt_report, "render_charts", counting)
+    changed = metrics.copy()
+    beta_roe = (changed["company_name"] == "Beta") & (changed["indicator_name"] == "roe")
+    changed.loc[beta_roe, "indicator_value"] = 0.5
+    second = export(changed)
+    assert sorted(rendered) == ["Beta_trend.png", "net_profit_margin_2023_bar.png"]
+    assert second[:2] == first[:2] and second[2:] != first[2:]
+    assert second[2] == second[3] and second[2].endswith(":Beta")
+
+    rendered.clear()
+    assert export(changed) == second and rendered == []
+    # Dropping Beta changes the shared bar chart, so Alpha is rebuilt and Beta's slides go.
+    remaining = export(changed[changed["company_name"] == "Alpha"])
+    assert [name.rsplit(":", 1)[1] for name in remaining] == ["Alpha", "Alpha"]
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+from app.api import routes
+from app.core.cache import ResultCache, make_cache_key
+from app.main import app
+from app.storage.repository import (
+    fetch_data_generation,
+    fetch_overall_df,
+    query_metrics,
+    replace_metrics,
+)
+
+
+def test_result_cache_lru_ttl_and_generation() -> None:
+    now = [0.0]
+    cache = ResultCache(max_entries=2, ttl_seconds=10, max_bytes=10**6, clock=lambda: now[0])
+    cache.sync_generation(1)
+    cache.set("a", [1])
+    cache.set("b", [2])
+    assert cache.get("a") == (True, [1])
+    cache.set("c", [3])
+    assert cache.get("b") == (False, None)
+
+    now[0] = 11
+    assert cache.get("a") == (False, None)
+
+    cache.set("d", [4], generation=1)
+    cache.sync_generation(2)
+    assert cache.get("d") == (False, None)
+    cache.set("e", [5], generation=1)
+    assert cache.get("e") == (False, None)
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["expirations"] == 1
+    assert stats["invalidations"] == 1 and stats["hits"] == 1
+    assert make_cache_key("q", {"b": "x", "a": None}) == make_cache_key("q", {"b": "x"})
+    # Loaders receive the raw values, so the key must not merge padded and stripped ones.
+    assert make_cache_key("q", {"b": " x "}) != make_cache_key("q", {"b": "x"})
+    assert make_cache_key("q", {"b": "x"}, "e1:1") != make_cache_key("q", {"b": "x"}, "e2:1")
+
+
+async def test_query_cache_invalidated_by_replace_metrics(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = str(tmp_path / "finance.db")
+    monkeypatch.setattr(routes.settings, "db_path", db_path)
+    routes.result_cache.clear()
+    metrics = pd.DataFrame(
+        [{"company_name": "Alpha", "year": 2023, "indicator_name": "roe", "indicator_value": 0.1}]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+    replace_metrics(db_path, metrics, overall)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = (await client.post("/query", json={"company": "Alpha"})).json()
+        second = (await client.post("/query", json={"company": " Alpha "})).json()
+        repeat = (await client.post("/query", json={"company": "Alpha"})).json()
+        replace_metrics(db_path, metrics.assign(indicator_value=0.2), overall)
+        third = (await client.post("/query", json={"company": "Alpha"})).json()
+        stats = (await client.get("/cache/stats")).json()["data"]
+
+    assert first["data"]["items"] and second["data"]["items"] == []
+    assert repeat["data"] == first["data"]
+    assert third["data"]["items"][0]["indicator_value"] == 0.2
+    assert stats["hits"] >= 1
+
+
+async def test_query_cache_not_reused_after_database_reset(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    db_path = tmp_path / "finance.db"
+    monkeypatch.setattr(routes.settings, "db_path", str(db_path))
+    routes.result_cache.clear()
+    metrics = pd.DataFrame(
+        [{"company_name": "Alpha", "year": 2023, "indicator_name": "roe", "indicator_value": 0.1}]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        replace_metrics(str(db_path), metrics, overall)
+        before = (await client.post("/query", json={"company": "Alpha"})).json()
+        # A recreated database file counts generations from 0 again.
+        db_path.unlink()
+        replace_metrics(str(db_path), metrics.assign(indicator_value=0.5), overall)
+        after = (await client.post("/query", json={"company": "Alpha"})).json()
+
+    assert before["data"]["items"][0]["indicator_value"] == 0.1
+    assert after["data"]["items"][0]["indicator_value"] == 0.5
+
+
+def test_failed_replace_metrics_keeps_old_rows_and_generation(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "finance.db")
+    metrics = pd.DataFrame(
+        [{"company_name": "Alpha", "year": 2023, "indicator_name": "roe", "indicator_value": 0.1}]
+    )
+    overall = pd.DataFrame([{"company_name": "Alpha", "year": 2023, "overall_risk_score": 10}])
+    replace_metrics(db_path, metrics, overall)
+    generation = fetch_data_generation(db_path)
+
+    # overall_risk.company_name is NOT NULL, so the second insert fails after the first.
+    with pytest.raises(sqlite3.IntegrityError):
+        replace_metrics(
+            db_path, metrics.assign(indicator_value=0.9), overall.assign(company_name=None)
+        )
+
+    assert fetch_data_generation(db_path) == generation
+    rows = query_metrics(db_path, company="Alpha")
+    assert [row["indicator_value"] for row in rows] == [0.1]
+    assert fetch_overall_df(db_path)["company_name"].tolist() == ["Alpha"]
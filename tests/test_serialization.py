@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from app.core import serialization
+
+
+@pytest.mark.parametrize("backend", ["orjson", "stdlib"])
+def test_dumps_handles_numpy_and_nan(backend: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    if backend == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+
+    payload = {
+        "value": np.float64("nan"),
+        "count": np.int64(3),
+        "ratio": 0.5,
+        "inf": float("inf"),
+        "items": np.array([1, 2]),
+        "name": "星河科技",
+    }
+    decoded = json.loads(serialization.dumps(payload))
+    assert decoded == {
+        "value": None,
+        "count": 3,
+        "ratio": 0.5,
+        "inf": None,
+        "items": [1, 2],
+        "name": "星河科技",
+    }
+    assert "星河科技".encode() in serialization.dumps(payload, indent=True)
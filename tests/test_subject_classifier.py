@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from app.analytics.indicators import SUBJECT_RULES, calculate_indicators
+from app.analytics.pipeline import resolve_subject_map
+from app.analytics.subject_classifier import classify_subjects, rules_version
+from app.storage.repository import (
+    fetch_subject_rule_map,
+    ingest_facts,
+    save_subject_rule_map,
+)
+
+
+def test_classify_subjects_once_per_distinct_path() -> None:
+    mapping = classify_subjects(
+        ["利润>净利润", "利润>净利润", "负债>流动负债", "其他"], SUBJECT_RULES
+    )
+    assert mapping["subject_path"].tolist() == ["利润>净利润", "负债>流动负债", "其他"]
+    assert mapping["rule_name"].tolist()[:2] == ["net_profit", "current_liabilities"]
+    assert mapping["rule_name"].isna().iloc[2]
+
+
+def test_subject_map_cached_in_db(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "finance.db")
+    facts = pd.DataFrame(
+        [
+            {
+                "company_name": "Alpha",
+                "statement_type": "income_statement",
+                "category": "收入",
+                "subject_path": path,
+                "subject_l1": "",
+                "subject_l2": "",
+                "subject_l3": "",
+                "year": 2023,
+                "amount": 100,
+            }
+            for path in ["收入>营业收入", "利润>净利润", "其他"]
+        ]
+    )
+    ingest_facts(db_path, facts)
+
+    first = resolve_subject_map(db_path)
+    cached = fetch_subject_rule_map(db_path, rules_version(SUBJECT_RULES))
+    assert len(cached) == len(first) == 3
+
+    resolve_subject_map(db_path)
+    assert len(fetch_subject_rule_map(db_path, rules_version(SUBJECT_RULES))) == 3
+
+
+def test_subject_map_saved_twice_keeps_one_row_per_path(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "finance.db")
+    version = rules_version(SUBJECT_RULES)
+    mapping = classify_subjects(["利润>净利润", "权益>所有者权益", "其他"], SUBJECT_RULES)
+    # Two calcs that both missed the cache race to store the same classification.
+    save_subject_rule_map(db_path, mapping, version)
+    save_subject_rule_map(db_path, mapping, version)
+
+    stored = fetch_subject_rule_map(db_path, version)
+    assert sorted(stored["subject_path"]) == sorted(mapping["subject_path"])
+
+
+def test_duplicate_subject_map_rows_do_not_double_amounts() -> None:
+    facts = pd.DataFrame(
+        [
+            {
+                "company_name": "Alpha",
+                "statement_type": statement,
+                "subject_path": path,
+                "year": 2023,
+                "amount": amount,
+            }
+            for statement, path, amount in [
+                ("income_statement", "收入>营业收入", 1000.0),
+                ("income_statement", "利润>净利润", 100.0),
+                ("balance_sheet", "权益>所有者权益", 500.0),
+            ]
+        ]
+    )
+    mapping = classify_subjects(facts["subject_path"].tolist(), SUBJECT_RULES)
+    once = calculate_indicators(facts, subject_map=mapping).metrics
+    twice = calculate_indicators(
+        facts, subject_map=pd.concat([mapping, mapping.iloc[:1]], ignore_index=True)
+    ).metrics
+    pd.testing.assert_frame_equal(once, twice)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from app.analytics.indicators import calculate_indicators
+from app.analytics.timeseries import calculate_time_series_indicators
+
+
+def _facts(amounts: dict[int, tuple[float, float]]) -> pd.DataFrame:
+    rows = []
+    for year, (revenue, net_profit) in amounts.items():
+        for statement_type, subject_path, amount in [
+            ("income_statement", "收入>营业收入", revenue),
+            ("income_statement", "利润>净利润", net_profit),
+            ("balance_sheet", "资产>流动资产", 100.0),
+            ("balance_sheet", "负债>流动负债", 50.0),
+            ("balance_sheet", "所有者权益", 200.0),
+        ]:
+            rows.append(
+                {
+                    "company_name": "Alpha",
+                    "statement_type": statement_type,
+                    "subject_path": subject_path,
+                    "year": year,
+                    "amount": amount,
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def test_growth_and_rolling_respect_year_gaps() -> None:
+    # 2021 is missing: 2022 has no YoY and no 3-year average, 2023 does.
+    facts = _facts({2020: (100.0, 10.0), 2022: (121.0, 12.0), 2023: (133.1, 15.0)})
+    base = calculate_indicators(facts).base
+    result = calculate_time_series_indicators(base).set_index(["indicator_name", "year"])
+
+    values = result["indicator_value"]
+    assert ("revenue_yoy", 2022) not in values.index
+    assert round(values[("revenue_yoy", 2023)], 4) == 0.1
+    assert round(values[("revenue_cagr_3y", 2023)], 4) == 0.1
+    assert ("net_profit_margin_avg_3y", 2023) not in values.index
+
+
+def test_rolling_average_over_contiguous_years() -> None:
+    facts = _facts({2021: (100.0, 10.0), 2022: (100.0, 20.0), 2023: (100.0, 30.0)})
+    base = calculate_indicators(facts).base
+    result = calculate_time_series_indicators(base).set_index(["indicator_name", "year"])
+
+    values = result["indicator_value"]
+    assert round(values[("net_profit_margin_avg_3y", 2023)], 4) == 0.2
+    assert values[("current_ratio_avg_3y", 2023)] == 2.0
+    assert ("roe_avg_5y", 2023) not in values.index